@@ -0,0 +1,15 @@
+"""性能基准测试
+使用固定随机种子生成的词库，测量加载、保存、搜索、排序和相似度算法等热点路径的耗时与峰值内存，
+结果写入JSON文件，便于在不同提交之间比较、发现性能回退
+
+用法（在项目根目录下）：
+  python -m benchmarks --sizes 1000 10000 100000 --output results.json
+  python -m benchmarks --compare results.json
+"""
+import os
+import sys
+
+# 程序模块位于src目录，按程序本身的方式（模块名直接导入）使用
+SRC_DIR: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
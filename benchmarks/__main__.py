@@ -0,0 +1,48 @@
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.runner import run_benchmarks, compare
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="单词管理系统性能基准测试")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help="词库规模（单词数），默认 1000 10000 100000，最大可测到1000000")
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), metavar='SCENARIO',
+                        help=f"只执行指定场景：{', '.join(SCENARIOS)}")
+    parser.add_argument('--repeat', type=int, default=5, help="每个场景的计时次数，默认5")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子，默认0")
+    parser.add_argument('--output', help="将结果写入JSON文件")
+    parser.add_argument('--compare', metavar='BASELINE', help="与之前的结果文件比较")
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help="耗时超过基准的该倍数时视为性能回退，默认1.2")
+    args = parser.parse_args(argv)
+
+    baseline: Optional[Dict[str, Any]] = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    results: Dict[str, Any] = run_benchmarks(args.sizes, args.scenarios, max(1, args.repeat), args.seed,
+                                             progress=print)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if baseline is not None:
+        lines, regressions = compare(baseline, results, args.threshold)
+        print(f"\n与 {args.compare} 比较（提交 {baseline.get('meta', {}).get('commit')}）：")
+        for line in lines:
+            print(line)
+        if regressions:
+            print(f"\n{len(regressions)}个场景耗时超过基准的{args.threshold}倍：", file=sys.stderr)
+            for line in regressions:
+                print(line, file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
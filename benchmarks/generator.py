@@ -0,0 +1,107 @@
+"""合成词库生成器
+按给定随机种子生成可复现的词库：拼写由音节拼接而成，长度分布接近真实英语单词，
+混有首字母大写的专有名词和带连字符的复合词；每个单词有1~4条释义，每条释义有0~3条例句
+"""
+import json
+import random
+from typing import Any, Dict, Iterator, List, Set
+
+_ONSETS: List[str] = ['', 'b', 'c', 'd', 'f', 'g', 'h', 'j', 'k', 'l', 'm', 'n', 'p', 'qu', 'r', 's', 't',
+                      'v', 'w', 'y', 'z', 'bl', 'br', 'ch', 'cl', 'cr', 'dr', 'fl', 'fr', 'gr', 'pl', 'pr',
+                      'sc', 'sh', 'sl', 'sp', 'st', 'str', 'th', 'tr', 'wh']
+_VOWELS: List[str] = ['a', 'e', 'i', 'o', 'u', 'y', 'ai', 'ea', 'ee', 'ie', 'oo', 'ou']
+_CODAS: List[str] = ['', '', '', 'b', 'ck', 'd', 'ft', 'g', 'l', 'll', 'm', 'n', 'nd', 'ng', 'nt', 'p', 'r',
+                     'rt', 's', 'ss', 'st', 't', 'x']
+_SUFFIXES: List[str] = ['', '', '', '', 'ed', 'er', 'est', 'ful', 'ing', 'ion', 'ity', 'less', 'ly', 'ment',
+                        'ness', 'ous', 's']
+# 音节数的权重：1~4个音节
+_SYLLABLE_WEIGHTS: List[int] = [30, 40, 20, 10]
+
+_POS: List[str] = ['n.', 'v.', 'adj.', 'adv.', 'prep.', 'conj.', 'pron.', 'int.', 'vt.', 'vi.']
+_POS_WEIGHTS: List[int] = [40, 20, 18, 8, 2, 2, 2, 1, 4, 3]
+
+# 释义和译句使用的常用汉字
+_HANZI: str = ('的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说'
+               '产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点'
+               '从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又')
+_WORDS: List[str] = ['the', 'a', 'is', 'was', 'very', 'we', 'they', 'often', 'never', 'this', 'that', 'my',
+                     'your', 'new', 'old', 'good', 'small', 'large', 'quickly', 'today', 'yesterday', 'in',
+                     'on', 'with', 'without', 'for', 'from', 'city', 'book', 'friend', 'house', 'water']
+
+
+def _spelling(rng: random.Random) -> str:
+    syllables: int = rng.choices(range(1, 5), _SYLLABLE_WEIGHTS)[0]
+    spelling: str = ''.join(rng.choice(_ONSETS) + rng.choice(_VOWELS) + rng.choice(_CODAS)
+                            for _ in range(syllables)) + rng.choice(_SUFFIXES)
+    roll: float = rng.random()
+    if roll < 0.05:
+        spelling = spelling.capitalize()
+    elif roll < 0.08:
+        spelling = spelling + '-' + _spelling(rng).lower()
+    return spelling
+
+
+def _hanzi(rng: random.Random, low: int, high: int) -> str:
+    return ''.join(rng.choice(_HANZI) for _ in range(rng.randint(low, high)))
+
+
+def _sentence(rng: random.Random, spelling: str) -> str:
+    words: List[str] = [rng.choice(_WORDS) for _ in range(rng.randint(3, 10))]
+    words.insert(rng.randrange(len(words) + 1), spelling)
+    return ' '.join(words).capitalize() + '.'
+
+
+def generate_records(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    生成count个拼写各不相同的单词记录（Word.to_dict的格式）
+
+    参数:
+        count: 单词数
+        seed: 随机种子，相同的种子生成相同的词库
+    """
+    rng = random.Random(seed)
+    seen: Set[str] = set()
+    while len(seen) < count:
+        spelling: str = _spelling(rng)
+        if spelling in seen:
+            continue
+        seen.add(spelling)
+        yield {
+            'spelling': spelling,
+            'definitions': [{
+                'pos': rng.choices(_POS, _POS_WEIGHTS)[0],
+                'meaning': _hanzi(rng, 1, 6),
+                'examples': [{
+                    'original_sentence': _sentence(rng, spelling),
+                    'translated_meaning': _hanzi(rng, 5, 20)
+                } for _ in range(rng.choices(range(4), [35, 40, 18, 7])[0])]
+            } for _ in range(rng.choices(range(1, 5), [55, 28, 12, 5])[0])]
+        }
+
+
+def write_vocabulary(path: str, count: int, seed: int = 0) -> None:
+    """将生成的词库写入JSON数组文件（与words.json格式相同）"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for i, record in enumerate(generate_records(count, seed)):
+            f.write(',\n' if i else '\n')
+            json.dump(record, f, ensure_ascii=False)
+        f.write('\n]')
+
+
+def misspell(rng: random.Random, spelling: str) -> str:
+    """对拼写做1~2处随机的插入、删除、替换或相邻交换，模拟用户的拼写错误"""
+    letters: List[str] = list(spelling)
+    for _ in range(rng.randint(1, 2)):
+        position: int = rng.randrange(len(letters) + 1)
+        edit: int = rng.randrange(4)
+        if edit == 0 or len(letters) < 2:
+            letters.insert(position, rng.choice('abcdefghijklmnopqrstuvwxyz'))
+        elif edit == 1:
+            del letters[min(position, len(letters) - 1)]
+        elif edit == 2:
+            letters[min(position, len(letters) - 1)] = rng.choice('abcdefghijklmnopqrstuvwxyz')
+        else:
+            position = min(position, len(letters) - 2)
+            letters[position], letters[position + 1] = letters[position + 1], letters[position]
+    return ''.join(letters)
@@ -0,0 +1,157 @@
+"""基准测试执行与结果比较"""
+import gc
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from algo import has_numpy
+from logic import WordManager
+from benchmarks.generator import write_vocabulary
+from benchmarks.scenarios import SCENARIOS, BenchmarkContext, Scenario
+
+# 结果文件格式版本号
+RESULT_FORMAT_VERSION = 1
+
+
+def _git_commit() -> Optional[str]:
+    # 当前提交的哈希，不在git仓库中时为None
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                              universal_newlines=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(scenario: Scenario, repeat: int) -> Dict[str, Any]:
+    """
+    执行场景：先计时repeat次（不跟踪内存，避免tracemalloc拖慢计时），再单独执行一次测量峰值内存
+
+    返回:
+        统计结果字典，时间单位为秒，内存单位为字节
+    """
+    if scenario.setup is not None:
+        scenario.setup()
+    timings: List[float] = []
+    for _ in range(repeat):
+        if scenario.prepare is not None:
+            scenario.prepare()
+        gc.collect()
+        start: float = time.perf_counter()
+        scenario.run()
+        timings.append(time.perf_counter() - start)
+
+    if scenario.prepare is not None:
+        scenario.prepare()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        scenario.run()
+        peak: int = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    median: float = statistics.median(timings)
+    return {
+        'operations': scenario.operations,
+        'repeat': repeat,
+        'min': min(timings),
+        'median': median,
+        'max': max(timings),
+        'per_operation': median / scenario.operations,
+        'peak_memory': peak,
+    }
+
+
+def run_benchmarks(sizes: Iterable[int], scenario_names: Optional[List[str]] = None, repeat: int = 5,
+                   seed: int = 0, progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """
+    在各词库规模下执行选定的场景
+
+    参数:
+        sizes: 词库规模（单词数）列表
+        scenario_names: 要执行的场景名，默认全部
+        repeat: 每个场景的计时次数
+        seed: 生成词库和查询的随机种子
+        progress: 每完成一个场景时调用，参数为一行说明
+
+    返回:
+        可直接写入JSON文件的结果
+    """
+    names: List[str] = [name for name in SCENARIOS if scenario_names is None or name in scenario_names]
+    results: List[Dict[str, Any]] = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix='benchmark-') as workdir:
+            vocabulary_path: str = os.path.join(workdir, 'words.json')
+            write_vocabulary(vocabulary_path, size, seed)
+            manager = WordManager()
+            try:
+                # 切换到生成的词库，之后的保存都写入临时目录
+                if not manager.load_words(vocabulary_path):
+                    raise RuntimeError(f"无法加载生成的词库: {vocabulary_path}")
+                context = BenchmarkContext(manager, workdir, vocabulary_path, size, seed, repeat + 1)
+                for name in names:
+                    scenario: Optional[Scenario] = SCENARIOS[name](context)
+                    if scenario is None:
+                        continue
+                    result: Dict[str, Any] = dict(scenario=name, size=size, **measure(scenario, repeat))
+                    results.append(result)
+                    if progress is not None:
+                        progress(format_result(result))
+            finally:
+                manager.close()
+
+    return {
+        'version': RESULT_FORMAT_VERSION,
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': has_numpy(),
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    return (f"{result['scenario']:<28}{result['size']:>9}  中位数 {result['median'] * 1000:10.3f} ms  "
+            f"单次 {result['per_operation'] * 1e6:12.2f} µs  峰值内存 {result['peak_memory'] / 1024:10.1f} KiB")
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            threshold: float = 1.2) -> Tuple[List[str], List[str]]:
+    """
+    按(场景, 规模)比较两次结果的中位耗时
+
+    参数:
+        baseline: 之前的结果
+        current: 本次结果
+        threshold: 耗时超过基准的该倍数时视为性能回退
+
+    返回:
+        (比较说明行列表, 性能回退说明行列表)
+    """
+    previous: Dict[Tuple[str, int], Dict[str, Any]] = {
+        (result['scenario'], result['size']): result for result in baseline.get('results', [])
+    }
+    lines: List[str] = []
+    regressions: List[str] = []
+    for result in current['results']:
+        old: Optional[Dict[str, Any]] = previous.get((result['scenario'], result['size']))
+        if old is None or old['median'] <= 0:
+            continue
+        time_ratio: float = result['median'] / old['median']
+        memory_ratio: float = result['peak_memory'] / old['peak_memory'] if old['peak_memory'] else 1.0
+        line: str = (f"{result['scenario']:<28}{result['size']:>9}  耗时 x{time_ratio:.2f}  "
+                     f"峰值内存 x{memory_ratio:.2f}")
+        lines.append(line)
+        if time_ratio > threshold:
+            regressions.append(line)
+    return lines, regressions
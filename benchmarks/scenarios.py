@@ -0,0 +1,202 @@
+"""基准测试场景
+每个场景包含一次性的准备（setup）、每次计时前的准备（prepare，不计时）和被测操作（run）
+场景按列表顺序执行：加载场景会用原始词库替换内存中的单词，保存场景会修改单词，因此排在最后
+"""
+import os
+import random
+import shutil
+import subprocess
+import sys
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+from algo import levenshtein_distance, ratio, partial_ratio, ratio_many, has_numpy, EncodedChoices
+from logic import WordManager
+from storage import open_storage
+from benchmarks import SRC_DIR
+from benchmarks.generator import misspell
+
+# 每次计时执行的查询数 / 算法调用数
+SEARCH_QUERIES = 20
+COMPLETE_QUERIES = 50
+ALGO_PAIRS = 2000
+RATIO_MANY_QUERIES = 5
+# 保存场景每次计时前修改的单词数
+SAVE_EDITS = 100
+# 程序显示第一个输入提示时输出的文字
+FIRST_PROMPT = '回车以继续'.encode('utf-8')
+
+
+class Scenario:
+    """一个计时场景"""
+
+    def __init__(self, name: str, run: Callable[[], Any], operations: int = 1,
+                 setup: Optional[Callable[[], Any]] = None,
+                 prepare: Optional[Callable[[], Any]] = None) -> None:
+        self.name: str = name
+        # 被测操作
+        self.run = run
+        # 每次run包含的操作数，用于计算单次操作的耗时
+        self.operations: int = operations
+        # 开始计时前执行一次
+        self.setup = setup
+        # 每次计时前执行
+        self.prepare = prepare
+
+
+class BenchmarkContext:
+    """某一词库规模下各场景共享的数据"""
+
+    def __init__(self, manager: WordManager, workdir: str, vocabulary_path: str, size: int, seed: int,
+                 runs: int) -> None:
+        self.manager: WordManager = manager
+        self.workdir: str = workdir
+        self.vocabulary_path: str = vocabulary_path
+        self.size: int = size
+        # 每个场景执行run的总次数（计时次数+内存测量），需要不重复输入的场景按此生成数据
+        self.runs: int = runs
+        self.rng = random.Random(seed)
+        self.spellings: List[str] = [word.spelling for word in manager.words]
+
+    def sample(self, count: int) -> List[str]:
+        return [self.rng.choice(self.spellings) for _ in range(count)]
+
+
+def _batches(context: BenchmarkContext, make: Callable[[], List[str]]) -> Iterator[List[str]]:
+    # 每次run使用不同的查询，避免命中上一次计时留下的搜索缓存
+    return iter([make() for _ in range(context.runs)])
+
+
+def _load_words(context: BenchmarkContext) -> Scenario:
+    return Scenario('load_words[json]', lambda: context.manager.load_words(context.vocabulary_path))
+
+
+def _load_words_sqlite(context: BenchmarkContext) -> Scenario:
+    path: str = os.path.join(context.workdir, 'words.db')
+
+    def setup() -> None:
+        storage = open_storage(path)
+        storage.write_all(context.manager.words)
+        storage.close()
+
+    return Scenario('load_words[sqlite]', lambda: context.manager.load_words(path), setup=setup)
+
+
+def _startup(context: BenchmarkContext) -> Scenario:
+    # 启动程序直到出现第一个输入提示（含解释器启动与模块导入），配置的words_path为相对路径，
+    # 在临时目录下放置src/words.json，使程序加载生成的词库
+    main_path: str = os.path.join(SRC_DIR, 'main.py')
+
+    def setup() -> None:
+        os.makedirs(os.path.join(context.workdir, 'src'), exist_ok=True)
+        shutil.copyfile(context.vocabulary_path, os.path.join(context.workdir, 'src', 'words.json'))
+
+    def run() -> None:
+        process = subprocess.Popen([sys.executable, main_path], cwd=context.workdir, stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                   env=dict(os.environ, PYTHONUNBUFFERED='1'))
+        try:
+            output: bytes = b''
+            while FIRST_PROMPT not in output:
+                chunk: bytes = os.read(process.stdout.fileno(), 4096)
+                if not chunk:
+                    raise RuntimeError("程序在显示提示前退出")
+                output += chunk
+        finally:
+            process.kill()
+            process.wait()
+            process.stdin.close()
+            process.stdout.close()
+
+    return Scenario('startup', run, setup=setup)
+
+
+def _get_all_words(context: BenchmarkContext) -> Scenario:
+    return Scenario('get_all_words', context.manager.get_all_words)
+
+
+def _search_words(context: BenchmarkContext) -> Scenario:
+    manager: WordManager = context.manager
+
+    def make() -> List[str]:
+        # 大部分为拼写错误的单词，少量为子串
+        queries: List[str] = [misspell(context.rng, spelling) for spelling in context.sample(SEARCH_QUERIES - 4)]
+        queries += [spelling[:4] for spelling in context.sample(4)]
+        return queries
+
+    batches: Iterator[List[str]] = _batches(context, make)
+    # setup中先搜索一次，使索引的构建不计入计时
+    return Scenario('search_words', lambda: [manager.search_words(q) for q in next(batches)],
+                    operations=SEARCH_QUERIES, setup=lambda: manager.search_words(context.spellings[0]))
+
+
+def _complete(context: BenchmarkContext) -> Scenario:
+    manager: WordManager = context.manager
+    prefixes: List[str] = [spelling[:context.rng.randint(1, 3)] for spelling in context.sample(COMPLETE_QUERIES)]
+    return Scenario('complete', lambda: [manager.complete(prefix) for prefix in prefixes],
+                    operations=COMPLETE_QUERIES, setup=lambda: manager.complete(''))
+
+
+def _algo_pairs(context: BenchmarkContext) -> List[Tuple[str, str]]:
+    return [(misspell(context.rng, spelling), spelling) for spelling in context.sample(ALGO_PAIRS)]
+
+
+def _levenshtein(context: BenchmarkContext) -> Scenario:
+    pairs = _algo_pairs(context)
+    return Scenario('algo.levenshtein_distance', lambda: [levenshtein_distance(a, b) for a, b in pairs],
+                    operations=len(pairs))
+
+
+def _ratio(context: BenchmarkContext) -> Scenario:
+    pairs = _algo_pairs(context)
+    return Scenario('algo.ratio', lambda: [ratio(a, b) for a, b in pairs], operations=len(pairs))
+
+
+def _partial_ratio(context: BenchmarkContext) -> Scenario:
+    pairs = [(a[:4], b) for a, b in _algo_pairs(context)]
+    return Scenario('algo.partial_ratio', lambda: [partial_ratio(a, b) for a, b in pairs], operations=len(pairs))
+
+
+def _ratio_many(context: BenchmarkContext) -> Optional[Scenario]:
+    # 需要numpy
+    if not has_numpy():
+        return None
+    encoded = EncodedChoices(context.spellings)
+    queries: List[str] = [misspell(context.rng, spelling) for spelling in context.sample(RATIO_MANY_QUERIES)]
+    return Scenario('algo.ratio_many', lambda: [ratio_many(q, encoded, score_cutoff=0.5) for q in queries],
+                    operations=len(queries))
+
+
+def _save_words(context: BenchmarkContext) -> Scenario:
+    manager: WordManager = context.manager
+    counter: List[int] = [0]
+
+    def prepare() -> None:
+        for _ in range(SAVE_EDITS):
+            counter[0] += 1
+            manager.add_word(f'benchmark-{counter[0]}')
+
+    # 另存到新文件，之后的增量保存追加到该文件的日志，不修改原始词库
+    return Scenario('save_words', manager.save_words, operations=SAVE_EDITS, prepare=prepare,
+                    setup=lambda: manager.save_words_as(os.path.join(context.workdir, 'saved.json')))
+
+
+def _compact(context: BenchmarkContext) -> Scenario:
+    manager: WordManager = context.manager
+    return Scenario('compact', manager.compact,
+                    setup=lambda: manager.save_words_as(os.path.join(context.workdir, 'compact.json')))
+
+
+# 场景名 -> 构建函数，按执行顺序排列
+SCENARIOS = {
+    'load_words[json]': _load_words,
+    'load_words[sqlite]': _load_words_sqlite,
+    'startup': _startup,
+    'get_all_words': _get_all_words,
+    'search_words': _search_words,
+    'complete': _complete,
+    'algo.levenshtein_distance': _levenshtein,
+    'algo.ratio': _ratio,
+    'algo.partial_ratio': _partial_ratio,
+    'algo.ratio_many': _ratio_many,
+    'save_words': _save_words,
+    'compact': _compact,
+}
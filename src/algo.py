@@ -1,59 +1,150 @@
 """Levenshtein算法实现，参考fuzzywuzzy库的核心逻辑
 提供字符串编辑距离计算和相似度评分功能
 """
-from typing import Tuple, Optional, List
+import heapq
+import math
+from typing import Callable, Dict, Tuple, Optional, List, Union
+from profiling import instrument
 
+# numpy为可选依赖，首次用到批量接口时才导入（导入耗时较长，不应拖慢程序启动），缺失时批量接口退化为逐个计算
+np = None
+_numpy_checked: bool = False
 
-def levenshtein_distance(s1: str, s2: str, case_sensitive: bool = True) -> int:
+
+# 长度不超过该值的字符串使用位并行算法，更长的使用两行动态规划
+_BIT_PARALLEL_LIMIT = 64
+
+# 候选数量达到该值时get_best_match改用批量向量化计算
+_BATCH_MIN_CHOICES = 64
+
+
+def levenshtein_distance(s1: str, s2: str, case_sensitive: bool = True,
+                         max_distance: Optional[int] = None) -> int:
     """
     计算两个字符串之间的Levenshtein编辑距离
     编辑操作包括：插入、删除、替换
+    较短字符串不超过64个字符时使用Myers/Hyyrö位并行算法，否则使用两行动态规划
 
     参数:
         s1: 第一个字符串
         s2: 第二个字符串
         case_sensitive: 是否区分大小写，默认为True
+        max_distance: 距离上界，默认为None（不限制）
+                      一旦确定距离超过上界即提前结束计算
 
     返回:
         两个字符串之间的编辑距离（操作次数）
+        若给定max_distance且距离超过它，返回max_distance + 1
     """
     if not case_sensitive:
         s1 = s1.lower()
         s2 = s2.lower()
 
+    if s1 == s2:
+        return 0
+
+    # 确保s1是较短的字符串
+    if len(s1) > len(s2):
+        s1, s2 = s2, s1
+
+    # 去除公共前缀和后缀，不影响编辑距离
+    start: int = 0
+    while start < len(s1) and s1[start] == s2[start]:
+        start += 1
+    end1, end2 = len(s1), len(s2)
+    while end1 > start and s1[end1 - 1] == s2[end2 - 1]:
+        end1 -= 1
+        end2 -= 1
+    s1, s2 = s1[start:end1], s2[start:end2]
+
+    # 长度差是编辑距离的下界
+    if max_distance is not None and len(s2) - len(s1) > max_distance:
+        return max_distance + 1
+
     # 处理空字符串情况
     if len(s1) == 0:
-        return len(s2)
-    if len(s2) == 0:
-        return len(s1)
-
-    # 创建动态规划矩阵
-    # dp[i][j]表示s1[:i]和s2[:j]之间的编辑距离
-    dp = [[0] * (len(s2) + 1) for _ in range(len(s1) + 1)]
-
-    # 初始化边界条件
-    for i in range(len(s1) + 1):
-        dp[i][0] = i
-    for j in range(len(s2) + 1):
-        dp[0][j] = j
-
-    # 填充动态规划矩阵
-    for i in range(1, len(s1) + 1):
-        for j in range(1, len(s2) + 1):
-            # 计算替换代价（0表示相同字符，1表示不同字符）
-            cost = 0 if s1[i-1] == s2[j-1] else 1
+        distance: int = len(s2)
+    elif len(s1) <= _BIT_PARALLEL_LIMIT:
+        distance = _bit_parallel_distance(s1, s2, max_distance)
+    else:
+        distance = _two_row_distance(s1, s2, max_distance)
+
+    if max_distance is not None and distance > max_distance:
+        return max_distance + 1
+    return distance
+
 
+def _pattern_masks(pattern: str) -> Dict[str, int]:
+    # 为模式串中的每个字符建立出现位置的位掩码
+    masks: Dict[str, int] = {}
+    for i, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks
+
+
+def _bit_parallel_distance(s1: str, s2: str, max_distance: Optional[int]) -> int:
+    """
+    Myers/Hyyrö位并行编辑距离
+    将动态规划矩阵的一列编码为垂直差分位向量（+1/-1），每处理s2的一个字符只需常数次位运算
+    要求s1非空，s1越短越快
+    """
+    masks: Dict[str, int] = _pattern_masks(s1)
+    mask: int = (1 << len(s1)) - 1
+    last: int = 1 << (len(s1) - 1)
+    positive: int = mask  # 垂直差分为+1的位置
+    negative: int = 0     # 垂直差分为-1的位置
+    score: int = len(s1)
+    remaining: int = len(s2)
+
+    for char in s2:
+        eq: int = masks.get(char, 0)
+        xv: int = eq | negative
+        xh: int = (((eq & positive) + positive) ^ positive) | eq
+        horizontal_positive: int = negative | (~(xh | positive) & mask)
+        horizontal_negative: int = positive & xh
+        if horizontal_positive & last:
+            score += 1
+        elif horizontal_negative & last:
+            score -= 1
+
+        remaining -= 1
+        # 剩余每个字符最多使距离减少1
+        if max_distance is not None and score - remaining > max_distance:
+            return max_distance + 1
+
+        horizontal_positive = (horizontal_positive << 1) | 1
+        horizontal_negative = horizontal_negative << 1
+        positive = (horizontal_negative | ~(xv | horizontal_positive)) & mask
+        negative = horizontal_positive & xv & mask
+
+    return score
+
+
+def _two_row_distance(s1: str, s2: str, max_distance: Optional[int]) -> int:
+    """
+    两行动态规划编辑距离，仅保留上一行和当前行
+    s1为较短字符串，每行对应s1的一个字符
+    """
+    # previous[j]表示s1[:i]和s2[:j]之间的编辑距离
+    previous: List[int] = list(range(len(s2) + 1))
+    for i, char1 in enumerate(s1, 1):
+        current: List[int] = [i]
+        for j, char2 in enumerate(s2, 1):
             # 取插入、删除、替换操作的最小值
-            dp[i][j] = min(
-                dp[i-1][j] + 1,          # 删除操作
-                dp[i][j-1] + 1,          # 插入操作
-                dp[i-1][j-1] + cost      # 替换操作
-            )
+            current.append(min(
+                previous[j] + 1,                         # 删除操作
+                current[j - 1] + 1,                      # 插入操作
+                previous[j - 1] + (char1 != char2)       # 替换操作
+            ))
+        # 任一行的最小值都是最终距离的下界
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
 
-    return dp[len(s1)][len(s2)]
+    return previous[-1]
 
 
-def ratio(s1: str, s2: str, case_sensitive: bool = True) -> float:
+def ratio(s1: str, s2: str, case_sensitive: bool = True, score_cutoff: float = 0.0) -> float:
     """
     计算两个字符串的相似度比例（0-1）
     基于Levenshtein距离，公式: (1 - 编辑距离/最大长度)
@@ -62,6 +153,8 @@ def ratio(s1: str, s2: str, case_sensitive: bool = True) -> float:
         s1: 第一个字符串
         s2: 第二个字符串
         case_sensitive: 是否区分大小写，默认为True
+        score_cutoff: 最低相似度，默认为0.0
+                      低于该值的结果不再精确计算，直接返回0.0
 
     返回:
         相似度比例（保留两位小数）
@@ -69,52 +162,278 @@ def ratio(s1: str, s2: str, case_sensitive: bool = True) -> float:
     if not s1 and not s2:
         return 1.0
 
-    distance = levenshtein_distance(s1, s2, case_sensitive)
     max_length = max(len(s1), len(s2))
-    similarity = (1 - distance / max_length)
+    max_distance: Optional[int] = None
+    if score_cutoff > 0:
+        max_distance = _cutoff_to_max_distance(max_length, score_cutoff)
+        if max_distance < 0:
+            return 0.0
+
+    distance = levenshtein_distance(s1, s2, case_sensitive, max_distance)
+    similarity = round(1 - distance / max_length, 2)
+
+    if score_cutoff > 0 and similarity < score_cutoff:
+        return 0.0
+    return similarity
+
 
-    return round(similarity, 2)
+def _cutoff_to_max_distance(max_length: int, score_cutoff: float) -> int:
+    # 相似度保留两位小数，放宽0.005以免舍入后达到阈值的结果被截断
+    return math.floor((1 - score_cutoff + 0.005) * max_length + 1e-9)
 
 
-def partial_ratio(s1: str, s2: str, case_sensitive: bool = True) -> float:
+def partial_ratio(s1: str, s2: str, case_sensitive: bool = True, score_cutoff: float = 0.0) -> float:
     """
     计算较短字符串与较长字符串所有可能子串的最佳相似度比例
     适用于部分匹配场景（如短查询匹配长文本）
+    采用Sellers近似子串匹配算法，一次遍历求出s1与s2任意子串之间的最小编辑距离
 
     参数:
         s1: 第一个字符串
         s2: 第二个字符串
         case_sensitive: 是否区分大小写，默认为True
+        score_cutoff: 最低相似度，低于该值时返回0.0，默认为0.0
 
     返回:
         最佳部分匹配相似度比例（保留两位小数）
     """
+    similarity: float = partial_ratio_many(s1, [s2], case_sensitive)[0]
+    if score_cutoff > 0 and similarity < score_cutoff:
+        return 0.0
+    return similarity
+
+
+@instrument('algo.partial_ratio_many')
+def partial_ratio_many(query: str, texts: List[str], case_sensitive: bool = True) -> List[float]:
+    """
+    批量计算查询字符串与多个长文本（如例句、释义）的部分匹配相似度
+    查询字符串的预处理只进行一次
+
+    参数:
+        query: 查询字符串
+        texts: 文本列表
+        case_sensitive: 是否区分大小写，默认为True
+
+    返回:
+        与texts一一对应的相似度比例列表（保留两位小数）
+    """
     if not case_sensitive:
-        s1 = s1.lower()
-        s2 = s2.lower()
+        query = query.lower()
 
-    # 确保s1是较短的字符串，s2是较长的字符串
-    if len(s1) > len(s2):
-        return 0.0
+    masks: Dict[str, int] = _pattern_masks(query)
+    results: List[float] = []
+    for text in texts:
+        if not case_sensitive:
+            text = text.lower()
+
+        # 确保查询是较短的字符串，文本是较长的字符串
+        if len(query) > len(text):
+            results.append(0.0)
+        elif not query:
+            results.append(1.0 if not text else 0.0)
+        elif query in text:
+            results.append(1.0)
+        else:
+            if len(query) <= _BIT_PARALLEL_LIMIT:
+                distance: int = _bit_parallel_substring_distance(masks, len(query), text)
+            else:
+                distance = _substring_distance(query, text)
+            results.append(round(1 - distance / len(query), 2))
+    return results
+
+
+def _bit_parallel_substring_distance(masks: Dict[str, int], length: int, text: str) -> int:
+    """
+    位并行的Sellers近似子串匹配，求模式串与文本任意子串之间的最小编辑距离
+    与_bit_parallel_distance相同，只是首行全为0（匹配可以从文本任意位置开始）
+    """
+    mask: int = (1 << length) - 1
+    last: int = 1 << (length - 1)
+    positive: int = mask
+    negative: int = 0
+    score: int = length
+    best: int = length
 
-    len1, len2 = len(s1), len(s2)
-    if len1 == 0:
-        return 1.0 if len2 == 0 else 0.0
-
-    best_ratio = 0.0
-    # 滑动窗口检查所有可能的子串
-    for i in range(len2 - len1 + 1):
-        substring = s2[i:i+len1]
-        current_distance = levenshtein_distance(s1, substring)
-        current_ratio = (1 - current_distance / len1)
-        if current_ratio > best_ratio:
-            best_ratio = current_ratio
-            if best_ratio == 1.0:  # 提前退出优化
+    for char in text:
+        eq: int = masks.get(char, 0)
+        xv: int = eq | negative
+        xh: int = (((eq & positive) + positive) ^ positive) | eq
+        horizontal_positive: int = negative | (~(xh | positive) & mask)
+        horizontal_negative: int = positive & xh
+        if horizontal_positive & last:
+            score += 1
+        elif horizontal_negative & last:
+            score -= 1
+            if score < best:
+                best = score
+                if best == 0:  # 提前退出优化
+                    break
+
+        horizontal_positive = horizontal_positive << 1
+        horizontal_negative = horizontal_negative << 1
+        positive = (horizontal_negative | ~(xv | horizontal_positive)) & mask
+        negative = horizontal_positive & xv & mask
+
+    return best
+
+
+def _substring_distance(pattern: str, text: str) -> int:
+    """
+    Sellers近似子串匹配的动态规划实现，按列遍历文本
+    column[i]表示pattern[:i]与以当前位置结尾的最佳子串之间的编辑距离
+    """
+    column: List[int] = list(range(len(pattern) + 1))
+    best: int = column[-1]
+    for char2 in text:
+        current: List[int] = [0]
+        for i, char1 in enumerate(pattern, 1):
+            current.append(min(
+                column[i] + 1,                       # 删除操作
+                current[i - 1] + 1,                  # 插入操作
+                column[i - 1] + (char1 != char2)     # 替换操作
+            ))
+        column = current
+        if column[-1] < best:
+            best = column[-1]
+            if best == 0:  # 提前退出优化
                 break
 
-    return round(best_ratio, 2)
+    return best
 
 
+def has_numpy() -> bool:
+    """批量向量化接口是否可用（已安装numpy），首次调用时导入numpy"""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            pass
+        _numpy_checked = True
+    return np is not None
+
+
+class EncodedChoices:
+    """
+    预先编码的候选字符串集合，供ratio_many重复使用
+    候选按长度分桶，每个桶编码为 (候选数, 长度) 的整数矩阵，桶内无需填充
+    """
+
+    def __init__(self, choices: List[str], case_sensitive: bool = True) -> None:
+        if not has_numpy():
+            raise ImportError("EncodedChoices requires numpy")
+        self.choices: List[str] = list(choices)
+        self.case_sensitive: bool = case_sensitive
+        self.lengths = np.fromiter((len(choice) for choice in self.choices), dtype=np.int64,
+                                   count=len(self.choices))
+
+        # 长度 -> (候选下标数组, 字符编码矩阵)
+        self.buckets: Dict[int, Tuple['np.ndarray', 'np.ndarray']] = {}
+        # lower()会改变长度的候选（如'İ'），由ratio逐个计算
+        self.irregular: List[int] = []
+        order = np.argsort(self.lengths, kind='stable')
+        bounds = np.flatnonzero(np.diff(self.lengths[order])) + 1
+        for indices in np.split(order, bounds):
+            if len(indices) == 0:
+                continue
+            length: int = int(self.lengths[indices[0]])
+            texts: List[str] = [self.choices[i] for i in indices]
+            if not case_sensitive:
+                texts = [text.lower() for text in texts]
+                regular: List[bool] = [len(text) == length for text in texts]
+                if not all(regular):
+                    self.irregular.extend(int(i) for i, keep in zip(indices, regular) if not keep)
+                    indices = indices[np.array(regular)]
+                    texts = [text for text, keep in zip(texts, regular) if keep]
+                    if not texts:
+                        continue
+            codes = np.frombuffer(''.join(texts).encode('utf-32-le'), dtype=np.uint32)
+            self.buckets[length] = (indices, codes.reshape(len(texts), length).astype(np.int64))
+
+    def __len__(self) -> int:
+        return len(self.choices)
+
+
+@instrument('algo.ratio_many')
+def ratio_many(query: str, choices: Union[List[str], EncodedChoices], case_sensitive: bool = True,
+               score_cutoff: float = 0.0):
+    """
+    批量计算查询字符串与全部候选的相似度比例，结果与ratio逐个计算一致
+    对同一长度的候选按行同时推进编辑距离动态规划，避免逐个候选的Python循环
+
+    参数:
+        query: 查询字符串
+        choices: 候选字符串列表，或预先编码的EncodedChoices（可重复使用）
+        case_sensitive: 是否区分大小写，默认为True
+        score_cutoff: 最低相似度，低于该值的结果为0.0，且长度差过大的候选整桶跳过
+
+    返回:
+        与候选一一对应的相似度数组（numpy.ndarray）
+        未安装numpy时返回列表
+    """
+    if not has_numpy():
+        texts: List[str] = choices.choices if isinstance(choices, EncodedChoices) else list(choices)
+        return [ratio(query, text, case_sensitive, score_cutoff) for text in texts]
+
+    if not isinstance(choices, EncodedChoices) or choices.case_sensitive != case_sensitive:
+        texts = choices.choices if isinstance(choices, EncodedChoices) else choices
+        choices = EncodedChoices(texts, case_sensitive)
+
+    scores = np.zeros(len(choices), dtype=np.float64)
+    for i in choices.irregular:
+        scores[i] = ratio(query, choices.choices[i], case_sensitive, score_cutoff)
+
+    # 与ratio一致：距离按小写后的字符计算，最大长度按原字符串计算
+    query_length: int = len(query)
+    query_codes = [ord(char) for char in (query if case_sensitive else query.lower())]
+    for length, (indices, codes) in choices.buckets.items():
+        max_length: int = max(query_length, length)
+        if max_length == 0:
+            scores[indices] = 1.0
+            continue
+        if score_cutoff > 0 and abs(len(query_codes) - length) > _cutoff_to_max_distance(max_length, score_cutoff):
+            continue
+        distances = _batch_distance(query_codes, codes)
+        bucket_scores = _ratio_table(max_length, max(len(query_codes), length))[distances]
+        if score_cutoff > 0:
+            bucket_scores[bucket_scores < score_cutoff] = 0.0
+        scores[indices] = bucket_scores
+    return scores
+
+
+def _batch_distance(query_codes: List[int], codes: 'np.ndarray') -> 'np.ndarray':
+    """
+    同时计算查询与一组等长候选之间的编辑距离
+    row[:, j]为查询前缀与各候选前j个字符的编辑距离，每次处理查询的一个字符
+    """
+    count, length = codes.shape
+    offsets = np.arange(length + 1)
+    row = np.broadcast_to(offsets, (count, length + 1)).copy()
+    for i, code in enumerate(query_codes, 1):
+        cost = (codes != code)
+        # 删除与替换操作只依赖上一行，可整行计算
+        base = np.empty_like(row)
+        base[:, 0] = i
+        np.minimum(row[:, 1:] + 1, row[:, :-1] + cost, out=base[:, 1:])
+        # 插入操作沿行传播：row[j] = min_k(base[k] + j - k)，用前缀最小值一次求出
+        row = np.minimum.accumulate(base - offsets, axis=1) + offsets
+    return row[:, -1]
+
+
+# (最大长度, 最大距离) -> 各编辑距离对应的相似度（与ratio的舍入方式一致）
+_RATIO_TABLES: Dict[Tuple[int, int], 'np.ndarray'] = {}
+
+
+def _ratio_table(max_length: int, max_distance: int) -> 'np.ndarray':
+    table = _RATIO_TABLES.get((max_length, max_distance))
+    if table is None:
+        table = np.array([round(1 - distance / max_length, 2) for distance in range(max_distance + 1)])
+        _RATIO_TABLES[(max_length, max_distance)] = table
+    return table
+
+
+@instrument('algo.get_best_match')
 def get_best_match(query: str, choices: List[str], case_sensitive: bool = True) -> Tuple[Optional[str], float]:
     """
     在候选列表中查找与查询字符串最相似的项
@@ -130,15 +449,92 @@ def get_best_match(query: str, choices: List[str], case_sensitive: bool = True)
     if not choices:
         return (None, 0.0)
 
+    if len(choices) >= _BATCH_MIN_CHOICES and has_numpy():
+        scores = ratio_many(query, choices, case_sensitive)
+        best = int(np.argmax(scores))
+        if scores[best] <= 0.0:
+            return (None, 0.0)
+        return (choices[best], float(scores[best]))
+
     best_match = None
     highest_ratio = 0.0
 
     for choice in choices:
-        current_ratio = ratio(query, choice, case_sensitive)
+        # 只有超过当前最高相似度的候选才需要精确计算
+        current_ratio = ratio(query, choice, case_sensitive, score_cutoff=round(highest_ratio + 0.01, 2))
         if current_ratio > highest_ratio:
             highest_ratio = current_ratio
             best_match = choice
             if highest_ratio == 1.0:  # 提前退出优化
                 break
 
-    return (best_match, highest_ratio)
\ No newline at end of file
+    return (best_match, highest_ratio)
+
+
+@instrument('algo.extract')
+def extract(query: str, choices: List[str], limit: Optional[int] = 5, score_cutoff: float = 0.0,
+            scorer: Callable[..., float] = ratio, case_sensitive: bool = True) -> List[Tuple[str, float]]:
+    """
+    在候选列表中查找与查询字符串最相似的至多limit项（对应fuzzywuzzy的process.extractBests）
+    用大小为limit的最小堆保存当前结果，每个候选只打分一次；堆满后以堆顶相似度作为新的最低相似度传给scorer，
+    不可能进入结果的候选在有界编辑距离计算中提前放弃
+
+    参数:
+        query: 查询字符串
+        choices: 候选字符串列表
+        limit: 最多返回的项数，默认为5，None表示全部
+        score_cutoff: 最低相似度，低于该值的候选不返回，默认为0.0
+        scorer: 打分函数，签名同ratio（接受case_sensitive和score_cutoff参数），默认为ratio
+        case_sensitive: 是否区分大小写，默认为True
+
+    返回:
+        (候选, 相似度) 列表，按相似度降序排列，相似度相同时保持候选原有顺序
+    """
+    if limit is not None and limit <= 0:
+        return []
+
+    if scorer is ratio and len(choices) >= _BATCH_MIN_CHOICES and has_numpy():
+        scores = ratio_many(query, choices, case_sensitive, score_cutoff)
+        indices = np.flatnonzero(scores >= score_cutoff)
+        # 稳定排序保证相似度相同时候选顺序不变
+        indices = indices[np.argsort(-scores[indices], kind='stable')][:limit]
+        return [(choices[i], float(scores[i])) for i in indices]
+
+    # 堆元素为 (相似度, -位置, 候选)，堆顶是当前最差的结果：相似度最低，相同时位置最靠后
+    heap: List[Tuple[float, int, str]] = []
+    cutoff: float = score_cutoff
+    for position, choice in enumerate(choices):
+        score: float = scorer(query, choice, case_sensitive, score_cutoff=cutoff)
+        if score < cutoff:
+            continue
+        if limit is None or len(heap) < limit:
+            heapq.heappush(heap, (score, -position, choice))
+            if limit is not None and len(heap) == limit:
+                cutoff = max(cutoff, heap[0][0])
+        elif score > heap[0][0]:
+            heapq.heapreplace(heap, (score, -position, choice))
+            cutoff = heap[0][0]
+
+    heap.sort(key=lambda item: (-item[0], -item[1]))
+    return [(choice, score) for score, _, choice in heap]
+
+
+def similarity_to_max_distance(length: int, similarity: float) -> Optional[int]:
+    """
+    将相似度阈值换算为编辑距离上界
+    对任意候选字符串，若 ratio(query, choice) > similarity，
+    则两者的编辑距离必不超过返回值（已考虑ratio保留两位小数的舍入）
+
+    参数:
+        length: 查询字符串长度
+        similarity: 相似度阈值（0-1）
+
+    返回:
+        编辑距离上界；阈值过低无法约束时返回None
+    """
+    # ratio四舍五入到两位小数，放宽0.005以免漏掉舍入后超过阈值的候选
+    effective: float = similarity - 0.005
+    if effective <= 0:
+        return None
+    # 设候选长度为L，需满足 |L-len| <= d < (1-s)*max(L, len)，可推出 L < len/s
+    return math.ceil((1 - effective) * length / effective)
@@ -0,0 +1,59 @@
+"""缓存工具
+提供带命中统计的有界LRU缓存
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+    有界LRU（最近最少使用）缓存
+    容量已满时淘汰最久未访问的条目，并统计命中与未命中次数
+    各操作加锁，可被多个线程（如查询服务的工作线程）同时使用
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity: int = max(0, capacity)
+        self.hits: int = 0
+        self.misses: int = 0
+        self._items: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """读取缓存条目，命中时将其标记为最近使用"""
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """写入缓存条目，超出容量时淘汰最久未使用的条目"""
+        if self.capacity == 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存条目（保留统计数据）"""
+        with self._lock:
+            self._items.clear()
+
+    def info(self) -> Dict[str, int]:
+        """返回缓存统计信息"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._items),
+                'capacity': self.capacity
+            }
+
+    def __len__(self) -> int:
+        return len(self._items)
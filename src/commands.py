@@ -0,0 +1,297 @@
+"""非交互式命令
+在一个进程中加载一次词库，执行单条子命令或批量执行文件/标准输入中的多条命令，供脚本调用
+
+用法：
+  python src/main.py [--json] [--no-save] search KEYWORD [--limit N]
+  python src/main.py [--json] [--no-save] add SPELLING [--pos POS --meaning MEANING [--example S --translation T]]
+  python src/main.py [--json] text QUERY [--limit N]
+  python src/main.py [--json] show SPELLING
+  python src/main.py [--json] [--no-save] import FILE... [--format csv|tsv|jsonl]
+  python src/main.py [--json] export PATH
+  python src/main.py [--json] stats
+  python src/main.py [--json] [--no-save] batch [FILE]   # 每行一条上述命令，FILE省略或为'-'时读取标准输入
+  python src/main.py [--no-save] serve [--host HOST] [--port PORT] [--workers N]   # 本地HTTP/JSON查询服务（见server.py）
+
+--json时每条命令输出一行JSON对象（含command和ok字段），否则输出便于阅读的文本
+有修改的命令（add、import）执行完后保存一次词库，批量模式在全部命令结束后保存一次，查询服务在停止时保存
+"""
+import argparse
+import csv
+import json
+import shlex
+import sys
+from typing import Any, Dict, List, Optional, TextIO
+from logic import WordManager
+from word import Word
+from importer import ImportReport, iter_records, IMPORT_FORMATS
+from settings import SERVER_HOST, SERVER_PORT, SERVER_WORKERS
+
+# 导入结果中最多列出的被拒绝记录数
+MAX_REJECTED_SHOWN = 20
+
+
+class CommandError(Exception):
+    """命令行参数错误或命令执行失败"""
+
+
+class _CommandParser(argparse.ArgumentParser):
+    # 参数错误时抛出异常而不是退出进程，批量模式下只让该行命令失败
+    def error(self, message: str) -> None:
+        raise CommandError(message)
+
+
+def _non_negative_int(value: str) -> int:
+    # --limit等参数的类型：非负整数
+    try:
+        number: int = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"不是整数: {value}")
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"不能为负数: {value}")
+    return number
+
+
+def _word_lines(word: Word) -> List[str]:
+    # 单词详情的文本形式（与交互界面的详情格式一致）
+    lines: List[str] = [f"===== {word.spelling} ====="]
+    if not word.definitions:
+        lines.append("  暂无释义")
+    for idx, definition in enumerate(word.definitions, 1):
+        lines.append(f"{idx}. [{definition.pos}] {definition.meaning}")
+        for jdx, example in enumerate(definition.examples, 1):
+            lines.append(f"   {jdx}) {example.original_sentence}")
+            lines.append(f"      {example.translated_meaning}")
+    return lines
+
+
+class CommandRunner:
+    """
+    执行子命令，每条命令返回结果字典，由output按文本或JSON格式输出
+    """
+
+    def __init__(self, manager: WordManager, as_json: bool = False, output: TextIO = sys.stdout) -> None:
+        self.manager: WordManager = manager
+        self.as_json: bool = as_json
+        self.output: TextIO = output
+        # 上次保存以来是否执行过修改命令
+        self.modified: bool = False
+        self.parser: _CommandParser = self._build_parser()
+
+    def _build_parser(self) -> _CommandParser:
+        parser = _CommandParser(prog='main.py', add_help=False)
+        subparsers = parser.add_subparsers(dest='command', parser_class=_CommandParser)
+        subparsers.required = True
+        # 子命令不提供-h（帮助会直接退出进程），用法见模块说明和 main.py -h
+        add_parser = lambda name, description: subparsers.add_parser(name, help=description, add_help=False)
+
+        search = add_parser('search', "模糊搜索单词")
+        search.add_argument('keyword')
+        search.add_argument('--limit', type=_non_negative_int, default=10, help="最多返回的结果数，默认10，0表示全部")
+        search.set_defaults(handler=self.search)
+
+        text = add_parser('text', "在释义和例句中全文查询单词，按相关度排序")
+        text.add_argument('query')
+        text.add_argument('--limit', type=_non_negative_int, default=10, help="最多返回的结果数，默认10，0表示全部")
+        text.set_defaults(handler=self.search_text)
+
+        add = add_parser('add', "添加单词（及释义、例句），已存在的部分自动合并")
+        add.add_argument('spelling')
+        add.add_argument('--pos', default='')
+        add.add_argument('--meaning', default='')
+        add.add_argument('--example', default='', help="例句原文")
+        add.add_argument('--translation', default='', help="例句译文")
+        add.set_defaults(handler=self.add)
+
+        show = add_parser('show', "显示单词详情（拼写不区分大小写）")
+        show.add_argument('spelling')
+        show.set_defaults(handler=self.show)
+
+        import_ = add_parser('import', "从CSV/TSV/JSON Lines文件批量导入")
+        import_.add_argument('files', nargs='+')
+        import_.add_argument('--format', choices=sorted(set(IMPORT_FORMATS.values())))
+        import_.set_defaults(handler=self.import_files)
+
+        export = add_parser('export', "导出全部单词（按扩展名选择JSON/JSON Lines/SQLite）")
+        export.add_argument('path')
+        export.set_defaults(handler=self.export)
+
+        stats = add_parser('stats', "词库统计")
+        stats.set_defaults(handler=self.stats)
+        return parser
+
+    def search(self, args: argparse.Namespace) -> Dict[str, Any]:
+        results: List[Word] = self.manager.search_words(args.keyword, args.limit if args.limit > 0 else None)
+        return {'keyword': args.keyword, 'results': [word.spelling for word in results]}
+
+    def search_text(self, args: argparse.Namespace) -> Dict[str, Any]:
+        results: List[Word] = self.manager.search_text(args.query, args.limit if args.limit > 0 else None)
+        return {'query': args.query, 'results': [word.spelling for word in results]}
+
+    def add(self, args: argparse.Namespace) -> Dict[str, Any]:
+        record: Dict[str, str] = {'spelling': args.spelling, 'pos': args.pos, 'meaning': args.meaning,
+                                  'original_sentence': args.example, 'translated_meaning': args.translation}
+        report: ImportReport = self.manager.bulk_import([record])
+        if report.rejected:
+            raise CommandError(report.rejected[0][1])
+        self.modified = True
+        return {'spelling': args.spelling.strip(), 'words_added': report.words_added,
+                'definitions_added': report.definitions_added, 'examples_added': report.examples_added}
+
+    def show(self, args: argparse.Namespace) -> Dict[str, Any]:
+        word: Optional[Word] = self.manager.get_word(args.spelling)
+        words: List[Word] = [word] if word is not None else self.manager.get_words_ignore_case(args.spelling)
+        if not words:
+            raise CommandError(f"单词 '{args.spelling}' 不存在")
+        return {'words': [word.to_dict() for word in words]}
+
+    def import_files(self, args: argparse.Namespace) -> Dict[str, Any]:
+        report = ImportReport()
+        try:
+            for path in args.files:
+                self.manager.bulk_import(iter_records(path, report, args.format), report=report)
+        except (OSError, ValueError, csv.Error) as e:
+            raise CommandError(str(e))
+        finally:
+            # 出错前已合并的记录同样保留在词库中，需要保存
+            self.modified = True
+        return {
+            'records': report.records, 'words_added': report.words_added,
+            'definitions_added': report.definitions_added, 'examples_added': report.examples_added,
+            'duplicates': report.duplicates, 'rejected': len(report.rejected),
+            'rejected_records': [{'record': number, 'reason': reason}
+                                 for number, reason in report.rejected[:MAX_REJECTED_SHOWN]],
+            'seconds': round(report.elapsed, 3), 'summary': report.summary(),
+        }
+
+    def export(self, args: argparse.Namespace) -> Dict[str, Any]:
+        if not self.manager.export_words(args.path):
+            raise CommandError(f"导出到 {args.path} 失败")
+        return {'path': args.path, 'words': self.manager.get_word_count()}
+
+    def stats(self, args: argparse.Namespace) -> Dict[str, Any]:
+        words: List[Word] = self.manager.words
+        definitions: int = sum(len(word.definitions) for word in words)
+        examples: int = sum(len(definition.examples) for word in words for definition in word.definitions)
+        return {'words': len(words), 'definitions': definitions, 'examples': examples,
+                'search_cache': self.manager.search_cache_info()}
+
+    def execute(self, argv: List[str]) -> bool:
+        """执行一条命令并输出结果，返回是否成功"""
+        command: str = argv[0] if argv else ''
+        try:
+            args: argparse.Namespace = self.parser.parse_args(argv)
+            command = args.command
+            result: Dict[str, Any] = args.handler(args)
+        except CommandError as e:
+            self._write({'command': command, 'ok': False, 'error': str(e)})
+            return False
+        self._write(dict(command=command, ok=True, **result))
+        return True
+
+    def run_batch(self, lines: TextIO) -> int:
+        """
+        逐行执行命令（忽略空行和#开头的注释行），返回失败的命令数
+        每条命令的输出立即刷新，调用方可以边写入命令边读取结果
+        """
+        failures: int = 0
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                argv: List[str] = shlex.split(line)
+            except ValueError as e:
+                self._write({'command': '', 'ok': False, 'error': f"无法解析命令: {str(e)}"})
+                failures += 1
+                continue
+            if argv[0] == 'batch':
+                self._write({'command': 'batch', 'ok': False, 'error': "批量命令不能嵌套"})
+                failures += 1
+                continue
+            if not self.execute(argv):
+                failures += 1
+        return failures
+
+    def _write(self, result: Dict[str, Any]) -> None:
+        if self.as_json:
+            print(json.dumps(result, ensure_ascii=False), file=self.output, flush=True)
+            return
+        if not result['ok']:
+            print(f"错误: {result['error']}", file=self.output, flush=True)
+            return
+        print('\n'.join(self._format_text(result)), file=self.output, flush=True)
+
+    def _format_text(self, result: Dict[str, Any]) -> List[str]:
+        command: str = result['command']
+        if command == 'search':
+            return result['results'] or [f"未找到包含 '{result['keyword']}' 的单词"]
+        if command == 'text':
+            return result['results'] or [f"未找到释义或例句中包含 '{result['query']}' 的单词"]
+        if command == 'add':
+            return [f"单词 '{result['spelling']}': 新增单词{result['words_added']}个、"
+                    f"释义{result['definitions_added']}条、例句{result['examples_added']}条"]
+        if command == 'show':
+            return [line for data in result['words'] for line in _word_lines(Word.from_dict(data))]
+        if command == 'import':
+            return [result['summary']] + [f"  第{item['record']}条记录: {item['reason']}"
+                                          for item in result['rejected_records']]
+        if command == 'export':
+            return [f"已导出{result['words']}个单词到 {result['path']}"]
+        if command == 'stats':
+            cache: Dict[str, int] = result['search_cache']
+            return [f"单词: {result['words']}", f"释义: {result['definitions']}", f"例句: {result['examples']}",
+                    f"搜索缓存: 命中 {cache['hits']} 次, 未命中 {cache['misses']} 次"]
+        return []
+
+
+def main(argv: List[str]) -> int:
+    """
+    执行命令行给出的子命令（或batch批量命令、serve查询服务），返回进程退出码：
+    0 全部成功，1 有命令失败或保存失败，2 命令文件无法读取或服务无法监听（全局参数错误时由argparse以2退出）
+    """
+    parser = argparse.ArgumentParser(prog='main.py', description="英语单词管理系统（非交互模式）",
+                                     epilog="子命令: search, text, add, show, import, export, stats, batch, serve；"
+                                            "不带参数运行时进入交互界面")
+    parser.add_argument('--json', action='store_true', help="每条命令输出一行JSON")
+    parser.add_argument('--no-save', action='store_true', help="不保存add/import的修改")
+    parser.add_argument('command', help="子命令")
+    parser.add_argument('arguments', nargs=argparse.REMAINDER, help="子命令的参数")
+    args = parser.parse_args(argv)
+
+    manager = WordManager()
+    runner = CommandRunner(manager, args.json)
+    try:
+        if args.command == 'serve':
+            # 查询服务模块只在启动服务时导入
+            from server import serve
+            serve_parser = argparse.ArgumentParser(prog='main.py serve', description="启动本地HTTP/JSON查询服务")
+            serve_parser.add_argument('--host', default=SERVER_HOST)
+            serve_parser.add_argument('--port', type=int, default=SERVER_PORT)
+            serve_parser.add_argument('--workers', type=int, default=SERVER_WORKERS, help="处理请求的线程数")
+            serve_args = serve_parser.parse_args(args.arguments)
+            try:
+                runner.modified = serve(manager, serve_args.host, serve_args.port, serve_args.workers)
+            except OSError as e:
+                print(f"无法启动查询服务: {str(e)}", file=sys.stderr)
+                return 2
+            ok: bool = True
+        elif args.command == 'batch':
+            source: str = args.arguments[0] if args.arguments else '-'
+            if source == '-':
+                failures: int = runner.run_batch(sys.stdin)
+            else:
+                try:
+                    with open(source, 'r', encoding='utf-8') as f:
+                        failures = runner.run_batch(f)
+                except OSError as e:
+                    print(f"无法读取命令文件: {str(e)}", file=sys.stderr)
+                    return 2
+            ok = failures == 0
+        else:
+            ok = runner.execute([args.command] + args.arguments)
+
+        if runner.modified and not args.no_save and not manager.save_words():
+            return 1
+        return 0 if ok else 1
+    finally:
+        manager.close()
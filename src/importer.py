@@ -0,0 +1,236 @@
+"""批量导入单词
+从CSV / TSV / JSON Lines文件流式读取记录，交给WordManager.bulk_import合并到词库
+
+记录格式（CSV/TSV首行为表头，JSON Lines每行一个对象）：
+  spelling, pos, meaning, original_sentence, translated_meaning
+每条记录表示一个单词的一条释义（及其一条例句），只有spelling时仅添加单词；
+JSON Lines也可以使用单词数据文件的嵌套格式（含definitions列表）
+
+命令行用法：
+  python src/importer.py words.csv [more.tsv ...] [--format csv|tsv|jsonl] [--no-save]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+# 每批合并的记录数，每批结束时报告一次进度
+IMPORT_BATCH_SIZE = 10000
+
+# 扩展名 -> 导入格式
+IMPORT_FORMATS: Dict[str, str] = {
+    '.csv': 'csv',
+    '.tsv': 'tsv',
+    '.tab': 'tsv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+}
+
+
+class ImportReport:
+    """一次批量导入的统计结果"""
+
+    def __init__(self) -> None:
+        # 读取到的记录数（含被拒绝的记录）
+        self.records: int = 0
+        # 新增的单词、释义、例句数
+        self.words_added: int = 0
+        self.definitions_added: int = 0
+        self.examples_added: int = 0
+        # 与词库或之前记录完全重复、无需合并的记录数
+        self.duplicates: int = 0
+        # 被拒绝的记录：(记录序号, 原因)
+        self.rejected: List[Tuple[int, str]] = []
+        self._started: float = time.perf_counter()
+        self.elapsed: float = 0.0
+
+    def reject(self, reason: str) -> None:
+        """拒绝当前记录（序号为已读取的记录数）"""
+        self.rejected.append((self.records, reason))
+
+    def finish(self) -> None:
+        """记录从创建到现在的耗时"""
+        self.elapsed = time.perf_counter() - self._started
+
+    @property
+    def throughput(self) -> float:
+        """每秒处理的记录数"""
+        return self.records / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return (f"共读取{self.records}条记录，新增单词{self.words_added}个、释义{self.definitions_added}条、"
+                f"例句{self.examples_added}条，重复{self.duplicates}条，拒绝{len(self.rejected)}条，"
+                f"耗时{self.elapsed:.2f}秒（{self.throughput:.0f}条/秒）")
+
+
+def detect_format(path: str) -> str:
+    """
+    按扩展名判断导入格式
+
+    异常:
+        ValueError: 不支持的扩展名
+    """
+    extension: str = os.path.splitext(path)[1].lower()
+    if extension not in IMPORT_FORMATS:
+        raise ValueError(f"不支持的导入文件格式: {path}（支持 {', '.join(IMPORT_FORMATS)}）")
+    return IMPORT_FORMATS[extension]
+
+
+def _iter_delimited(fp: TextIO, delimiter: str, report: ImportReport) -> Iterator[Dict[str, Any]]:
+    reader = csv.DictReader(fp, delimiter=delimiter)
+    if reader.fieldnames is None:
+        return
+    if 'spelling' not in reader.fieldnames:
+        raise ValueError("表头缺少spelling列")
+    for row in reader:
+        # 多出的值在None键下；末尾缺少的列为None，按空字段处理
+        if None in row:
+            report.records += 1
+            report.reject("列数多于表头")
+            continue
+        yield row
+
+
+def _iter_jsonl(fp: TextIO, report: ImportReport) -> Iterator[Dict[str, Any]]:
+    # 逐行解析，单行格式错误只拒绝该行，不中断导入
+    for line in fp:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            report.records += 1
+            report.reject(f"JSON解析失败: {e.msg}")
+
+
+def iter_records(path: str, report: ImportReport, file_format: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    流式读取导入文件中的记录
+
+    参数:
+        path: 文件路径
+        report: 导入统计，无法解析的行直接记为被拒绝的记录
+        file_format: csv / tsv / jsonl，默认按扩展名判断
+
+    返回:
+        依次产生每条记录（字典）的迭代器
+
+    异常:
+        ValueError: 格式不支持或CSV/TSV缺少spelling列
+        OSError: 文件无法读取
+    """
+    file_format = file_format or detect_format(path)
+    # utf-8-sig兼容表格软件导出时带BOM的文件
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if file_format == 'csv':
+            yield from _iter_delimited(f, ',', report)
+        elif file_format == 'tsv':
+            yield from _iter_delimited(f, '\t', report)
+        elif file_format == 'jsonl':
+            yield from _iter_jsonl(f, report)
+        else:
+            raise ValueError(f"不支持的导入文件格式: {file_format}")
+
+
+def _text_field(data: Dict[str, Any], field: str) -> str:
+    # 读取可选的文本字段，缺失或为null时为空字符串
+    value: Any = data.get(field)
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise ValueError(f"{field}不是字符串")
+    return value.strip()
+
+
+def _parse_examples(data: Dict[str, Any]) -> List[Tuple[str, str]]:
+    examples: List[Tuple[str, str]] = []
+    for example_data in data.get('examples') or []:
+        if not isinstance(example_data, dict):
+            raise ValueError("例句不是对象")
+        example: Tuple[str, str] = (_text_field(example_data, 'original_sentence'),
+                                    _text_field(example_data, 'translated_meaning'))
+        if any(example):
+            examples.append(example)
+    return examples
+
+
+def parse_record(record: Any) -> Tuple[str, List[Tuple[str, str, List[Tuple[str, str]]]]]:
+    """
+    校验并规范化一条导入记录
+
+    返回:
+        (拼写, [(词性, 释义, [(原句, 译句), ...]), ...])
+
+    异常:
+        ValueError: 记录无效，异常信息为拒绝原因
+    """
+    if not isinstance(record, dict):
+        raise ValueError("记录不是对象")
+    spelling: str = _text_field(record, 'spelling')
+    if not spelling:
+        raise ValueError("缺少单词拼写")
+
+    definitions: List[Tuple[str, str, List[Tuple[str, str]]]] = []
+    if 'definitions' in record:
+        # 嵌套格式（与单词数据文件相同）
+        if not isinstance(record['definitions'], list):
+            raise ValueError("definitions不是列表")
+        for def_data in record['definitions']:
+            if not isinstance(def_data, dict):
+                raise ValueError("释义不是对象")
+            meaning: str = _text_field(def_data, 'meaning')
+            if not meaning:
+                raise ValueError("缺少释义内容")
+            definitions.append((_text_field(def_data, 'pos'), meaning, _parse_examples(def_data)))
+        return spelling, definitions
+
+    # 扁平格式：一条记录至多一条释义和一条例句
+    pos: str = _text_field(record, 'pos')
+    meaning = _text_field(record, 'meaning')
+    example: Tuple[str, str] = (_text_field(record, 'original_sentence'),
+                                _text_field(record, 'translated_meaning'))
+    if meaning:
+        definitions.append((pos, meaning, [example] if any(example) else []))
+    elif pos or any(example):
+        raise ValueError("缺少释义内容")
+    return spelling, definitions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    # logic导入了本模块，在函数内导入以避免循环导入
+    from logic import WordManager
+
+    parser = argparse.ArgumentParser(description="从CSV/TSV/JSON Lines文件批量导入单词")
+    parser.add_argument('files', nargs='+', help="导入文件")
+    parser.add_argument('--format', choices=sorted(set(IMPORT_FORMATS.values())), help="文件格式，默认按扩展名判断")
+    parser.add_argument('--no-save', action='store_true', help="只检查和统计，不保存到词库")
+    args = parser.parse_args(argv)
+
+    manager = WordManager()
+    report = ImportReport()
+    progress = lambda r: print(f"已处理{r.records}条记录...", file=sys.stderr)
+    try:
+        for path in args.files:
+            manager.bulk_import(iter_records(path, report, args.format), report=report, progress=progress)
+    except (OSError, ValueError, csv.Error) as e:
+        print(f"导入失败: {str(e)}", file=sys.stderr)
+        manager.close()
+        return 1
+
+    print(report.summary())
+    for number, reason in report.rejected[:20]:
+        print(f"  第{number}条记录: {reason}")
+    if len(report.rejected) > 20:
+        print(f"  ……另有{len(report.rejected) - 20}条被拒绝的记录")
+
+    saved: bool = args.no_save or manager.save_words()
+    manager.close()
+    return 0 if saved else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
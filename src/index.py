@@ -0,0 +1,391 @@
+"""单词索引结构
+为WordManager提供加速查询所用的辅助索引
+"""
+import gc
+from bisect import insort
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+@contextmanager
+def gc_paused():
+    """
+    批量构建索引或导入数据期间暂停循环垃圾回收
+    构建时会创建大量容器对象，频繁触发的分代回收占据了大部分耗时，而这些对象并不构成引用环
+    """
+    enabled: bool = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class BKTree:
+    """
+    BK树（Burkhard-Keller树），基于编辑距离等度量函数的度量空间索引
+    利用三角不等式剪枝，使有界编辑距离查询无需遍历全部元素
+
+    每个节点为列表 [元素, 是否有效, {到父节点的距离: 子节点}]
+    删除采用惰性标记，失效节点过多时整体重建
+    度量函数需支持max_distance关键字参数，距离超过上界时可返回任意大于上界的值
+    """
+
+    def __init__(self, distance: Callable[[str, str], int], items: Iterable[str] = ()) -> None:
+        self._distance = distance
+        self._root: Optional[list] = None
+        # 有效元素数与失效（已删除）节点数
+        self._size: int = 0
+        self._dead: int = 0
+        with gc_paused():
+            for item in items:
+                self.add(item)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _find(self, item: str) -> Optional[list]:
+        # 查找元素所在节点（距离为0的路径）
+        node = self._root
+        while node is not None:
+            if node[0] == item:
+                return node
+            node = node[2].get(self._distance(item, node[0]))
+        return None
+
+    def add(self, item: str) -> bool:
+        """添加元素，已存在时返回False"""
+        if self._root is None:
+            self._root = [item, True, {}]
+            self._size = 1
+            return True
+
+        node = self._root
+        while True:
+            if node[0] == item:
+                if node[1]:
+                    return False
+                # 复活惰性删除的节点
+                node[1] = True
+                self._size += 1
+                self._dead -= 1
+                return True
+            distance: int = self._distance(item, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [item, True, {}]
+                self._size += 1
+                return True
+            node = child
+
+    def remove(self, item: str) -> bool:
+        """删除元素（惰性标记），不存在时返回False"""
+        node = self._find(item)
+        if node is None or not node[1]:
+            return False
+        node[1] = False
+        self._size -= 1
+        self._dead += 1
+        # 失效节点超过一半时重建，保证查询效率
+        if self._dead > self._size:
+            self._rebuild()
+        return True
+
+    def _rebuild(self) -> None:
+        items: List[str] = list(self)
+        self._root = None
+        self._size = 0
+        self._dead = 0
+        for item in items:
+            self.add(item)
+
+    def __iter__(self):
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            if node[1]:
+                yield node[0]
+            stack.extend(node[2].values())
+
+    def query(self, item: str, max_distance: int) -> Tuple[List[Tuple[int, str]], int]:
+        """
+        查找与给定元素距离不超过max_distance的全部元素
+
+        参数:
+            item: 查询元素
+            max_distance: 最大距离（含）
+
+        返回:
+            ((距离, 元素) 列表（按距离升序排列）, 本次查询计算距离的次数)
+        """
+        results: List[Tuple[int, str]] = []
+        stack = [self._root] if self._root is not None else []
+        evaluations: int = 0
+        while stack:
+            node = stack.pop()
+            evaluations += 1
+            # 距离超过 最大子节点距离+r 时已无子树需要访问，无需计算精确距离
+            bound: int = max_distance + max(node[2], default=0)
+            distance: int = self._distance(item, node[0], max_distance=bound)
+            if distance <= max_distance and node[1]:
+                results.append((distance, node[0]))
+            # 三角不等式：只有距离在 [d-r, d+r] 内的子树可能包含结果
+            low, high = distance - max_distance, distance + max_distance
+            for child_distance, child in node[2].items():
+                if low <= child_distance <= high:
+                    stack.append(child)
+        results.sort()
+        return results, evaluations
+
+
+class _TrieNode:
+    __slots__ = ('children', 'spellings', 'count')
+
+    def __init__(self) -> None:
+        # 子节点：字符 -> 节点
+        self.children: Dict[str, '_TrieNode'] = {}
+        # 以该节点结尾的拼写（有序），没有时为None
+        self.spellings: Optional[List[str]] = None
+        # 子树中的拼写总数，用于分页时整棵跳过子树
+        self.count: int = 0
+
+
+class Trie:
+    """
+    字符前缀树，按忽略大小写的拼写（casefold）建立路径
+    前缀补全的耗时与前缀长度及返回条数成正比，与词库大小无关
+    """
+
+    def __init__(self, items: Iterable[str] = ()) -> None:
+        self.root: _TrieNode = _TrieNode()
+        # 每次增删递增，供FuzzySession判断缓存的状态是否失效
+        self.version: int = 0
+        with gc_paused():
+            for item in items:
+                self.add(item)
+
+    def __len__(self) -> int:
+        return self.root.count
+
+    def _find(self, key: str) -> Optional[_TrieNode]:
+        node: Optional[_TrieNode] = self.root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def add(self, item: str) -> bool:
+        """添加拼写，已存在时返回False"""
+        key: str = item.casefold()
+        terminal: Optional[_TrieNode] = self._find(key)
+        if terminal is not None and terminal.spellings and item in terminal.spellings:
+            return False
+
+        node: _TrieNode = self.root
+        node.count += 1
+        for char in key:
+            child: Optional[_TrieNode] = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _TrieNode()
+            child.count += 1
+            node = child
+        if node.spellings is None:
+            node.spellings = []
+        insort(node.spellings, item)
+        self.version += 1
+        return True
+
+    def remove(self, item: str) -> bool:
+        """删除拼写并裁剪空分支，不存在时返回False"""
+        key: str = item.casefold()
+        path: List[_TrieNode] = [self.root]
+        for char in key:
+            child: Optional[_TrieNode] = path[-1].children.get(char)
+            if child is None:
+                return False
+            path.append(child)
+        terminal: _TrieNode = path[-1]
+        if not terminal.spellings or item not in terminal.spellings:
+            return False
+
+        terminal.spellings.remove(item)
+        if not terminal.spellings:
+            terminal.spellings = None
+        for node in path:
+            node.count -= 1
+        self.version += 1
+        # 从叶子向上删除已经为空的节点
+        for depth in range(len(key), 0, -1):
+            if path[depth].count:
+                break
+            del path[depth - 1].children[key[depth - 1]]
+        return True
+
+    def count_prefix(self, prefix: str) -> int:
+        """返回以给定前缀开头（忽略大小写）的拼写数"""
+        node: Optional[_TrieNode] = self._find(prefix.casefold())
+        return node.count if node is not None else 0
+
+    def complete(self, prefix: str, limit: int, offset: int = 0) -> List[str]:
+        """
+        按字典序返回以给定前缀开头（忽略大小写）的拼写
+
+        参数:
+            prefix: 前缀
+            limit: 最多返回的条数
+            offset: 跳过的条数（用于分页），整棵子树可直接跳过
+
+        返回:
+            拼写列表
+        """
+        node: Optional[_TrieNode] = self._find(prefix.casefold())
+        results: List[str] = []
+        if node is None or limit <= 0 or offset >= node.count:
+            return results
+
+        skip: int = offset
+        # 深度优先遍历，栈中保存各层尚未访问的子节点（已按字符排序）
+        stack: List[Iterator[Tuple[str, _TrieNode]]] = []
+        while True:
+            if node is not None:
+                if node.spellings:
+                    for spelling in node.spellings:
+                        if skip:
+                            skip -= 1
+                            continue
+                        results.append(spelling)
+                        if len(results) == limit:
+                            return results
+                stack.append(iter(sorted(node.children.items())))
+            node = None
+            if not stack:
+                return results
+            for _, child in stack[-1]:
+                if skip >= child.count:
+                    skip -= child.count
+                    continue
+                node = child
+                break
+            else:
+                stack.pop()
+
+
+class FuzzySession:
+    """
+    边输入边搜索的增量模糊查询会话（基于前缀树的Levenshtein自动机）
+
+    rows[i]保存查询前i个字符与前缀树各节点所表示字符串之间的编辑距离，
+    只保留不超过max_distance的节点（即自动机的活跃状态）。
+    追加字符时由最后一行推出新的一行，删除字符时直接丢弃末行，无需从头计算
+    比较时忽略大小写（与前缀树一致）
+    """
+
+    def __init__(self, get_trie: Callable[[], Trie], max_distance: int = 2) -> None:
+        # 获取当前前缀树的函数（前缀树可能被整体重建）
+        self._get_trie = get_trie
+        self.max_distance: int = max(0, max_distance)
+        self._query: str = ''
+        self._trie: Optional[Trie] = None
+        self._version: int = -1
+        self._rows: List[Dict[_TrieNode, int]] = []
+
+    @property
+    def query(self) -> str:
+        return self._query
+
+    def _sync(self) -> None:
+        # 前缀树发生变化时按当前查询重新计算全部行
+        trie: Trie = self._get_trie()
+        if trie is self._trie and trie.version == self._version:
+            return
+        self._trie, self._version = trie, trie.version
+        self._rows = [self._first_row()]
+        for char in self._query:
+            self._rows.append(self._next_row(self._rows[-1], char))
+
+    def _first_row(self) -> Dict[_TrieNode, int]:
+        # 空查询与深度为d的节点之间的距离为d
+        row: Dict[_TrieNode, int] = {}
+        stack: List[Tuple[_TrieNode, int]] = [(self._trie.root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            row[node] = depth
+            if depth < self.max_distance:
+                stack.extend((child, depth + 1) for child in node.children.values())
+        return row
+
+    def _next_row(self, previous: Dict[_TrieNode, int], char: str) -> Dict[_TrieNode, int]:
+        """
+        由上一行推出追加字符char后的新行
+        新值 = min(上一行同节点+1（删除）, 上一行父节点+替换代价, 新行父节点+1（插入）)
+        前两项只依赖上一行的活跃节点；插入项沿前缀树向下每层+1，按距离从小到大传播
+        """
+        limit: int = self.max_distance
+        candidates: Dict[_TrieNode, int] = {}
+        for node, value in previous.items():
+            if value + 1 <= limit and value + 1 < candidates.get(node, limit + 1):
+                candidates[node] = value + 1                                   # 删除查询字符
+            for child_char, child in node.children.items():
+                cost: int = value + (child_char != char)                       # 匹配或替换
+                if cost <= limit and cost < candidates.get(child, limit + 1):
+                    candidates[child] = cost
+
+        buckets: List[List[_TrieNode]] = [[] for _ in range(limit + 1)]
+        for node, value in candidates.items():
+            buckets[value].append(node)
+        row: Dict[_TrieNode, int] = {}
+        for value in range(limit + 1):
+            for node in buckets[value]:
+                if node in row:
+                    continue
+                row[node] = value
+                if value < limit:
+                    for child in node.children.values():                       # 插入节点字符
+                        if child not in row and value + 1 < candidates.get(child, limit + 1):
+                            candidates[child] = value + 1
+                            buckets[value + 1].append(child)
+        return row
+
+    def push(self, text: str) -> None:
+        """在查询末尾追加字符，每个字符只计算一行"""
+        self._sync()
+        for char in text.casefold():
+            self._rows.append(self._next_row(self._rows[-1], char))
+            self._query += char
+
+    def pop(self, count: int = 1) -> None:
+        """删除查询末尾的count个字符，直接丢弃对应的行"""
+        count = min(max(0, count), len(self._query))
+        if count:
+            self._query = self._query[:-count]
+            del self._rows[-count:]
+
+    def set_query(self, query: str) -> None:
+        """将查询改为query，只重新计算与当前查询公共前缀之后的部分"""
+        query = query.casefold()
+        common: int = 0
+        while common < min(len(query), len(self._query)) and query[common] == self._query[common]:
+            common += 1
+        self.pop(len(self._query) - common)
+        self.push(query[common:])
+
+    def matches(self, limit: Optional[int] = None) -> List[Tuple[int, str]]:
+        """
+        返回与当前查询的编辑距离不超过max_distance的拼写
+
+        参数:
+            limit: 最多返回的条数，默认全部
+
+        返回:
+            (编辑距离, 拼写) 列表，按距离、拼写升序排列
+        """
+        self._sync()
+        results: List[Tuple[int, str]] = [
+            (distance, spelling)
+            for node, distance in self._rows[-1].items() if node.spellings
+            for spelling in node.spellings
+        ]
+        results.sort()
+        return results if limit is None else results[:limit]
@@ -0,0 +1,153 @@
+"""单词数据的预写日志（write-ahead journal）
+快照文件保存完整的单词数据，日志文件按行追加此后的每次修改操作
+保存时只需追加日志，日志过长时再压缩为新快照
+"""
+import json
+import os
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from word import Word
+
+
+class WordJournal:
+    """
+    管理单词快照文件及其日志文件（快照路径 + '.journal'）
+
+    日志第一行记录所基于快照的 (文件大小, 修改时间)，
+    压缩中途崩溃（新快照已替换但日志未删除）时，日志与快照不再匹配，回放时会被丢弃
+    """
+
+    def __init__(self, snapshot_path: str) -> None:
+        self.snapshot_path: str = snapshot_path
+        self.journal_path: str = snapshot_path + '.journal'
+
+    def _snapshot_stamp(self) -> Optional[List[int]]:
+        # 快照文件的 [大小, 修改时间]，文件不存在时返回None
+        try:
+            stat = os.stat(self.snapshot_path)
+        except FileNotFoundError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def has_snapshot(self) -> bool:
+        """快照文件是否存在"""
+        return os.path.exists(self.snapshot_path)
+
+    def append(self, ops: List[Dict[str, Any]]) -> None:
+        """
+        追加操作到日志并同步到磁盘
+
+        参数:
+            ops: 操作列表，每个操作为包含'op'字段的字典
+        """
+        if not ops:
+            return
+        # 日志不存在或已过期（基于旧快照）时重新开始
+        current: bool = self._read_header() == self._snapshot_stamp()
+        with open(self.journal_path, 'a' if current else 'w', encoding='utf-8') as f:
+            if not current:
+                f.write(json.dumps({'snapshot': self._snapshot_stamp()}) + '\n')
+            for op in ops:
+                f.write(json.dumps(op, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read_header(self) -> Optional[List[int]]:
+        # 读取日志所基于快照的 [大小, 修改时间]，日志不存在或不完整时返回None
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                header: Optional[Dict[str, Any]] = _parse_line(f.readline())
+        except FileNotFoundError:
+            return None
+        return header.get('snapshot') if header is not None else None
+
+    def iter_ops(self) -> Iterator[Dict[str, Any]]:
+        """
+        依次返回日志中的操作
+        日志与当前快照不匹配时视为已压缩，不返回任何操作；
+        末尾因崩溃写入不完整的行会被忽略
+        """
+        try:
+            f = open(self.journal_path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with f:
+            header: Optional[Dict[str, Any]] = _parse_line(f.readline())
+            if header is None or header.get('snapshot') != self._snapshot_stamp():
+                return
+            for line in f:
+                op: Optional[Dict[str, Any]] = _parse_line(line)
+                if op is None:
+                    return
+                yield op
+
+    def write_snapshot(self, words: Iterable[Word]) -> None:
+        """
+        将全部单词写入新快照并清空日志
+        先写入同目录下的临时文件，同步后原子替换原快照
+        """
+        directory: str = os.path.dirname(os.path.abspath(self.snapshot_path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.words-', suffix='.tmp')
+        try:
+            # mkstemp创建的文件仅当前用户可读写，沿用原快照或默认的权限
+            os.chmod(temp_path, _snapshot_mode(self.snapshot_path))
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                if self.snapshot_path.endswith('.jsonl'):
+                    _write_json_lines(f, words)
+                else:
+                    _write_json_array(f, words)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.snapshot_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+
+def _read_umask() -> int:
+    # os.umask只能在设置的同时读取，会短暂修改整个进程的umask，因此只在导入时（尚未启动其他线程）读取一次
+    umask: int = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# 新建文件的默认权限
+_DEFAULT_MODE: int = 0o666 & ~_read_umask()
+
+
+def _snapshot_mode(path: str) -> int:
+    # 原快照存在时沿用其权限，否则使用按umask计算的新文件默认权限
+    try:
+        return os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        return _DEFAULT_MODE
+
+
+def _parse_line(line: str) -> Optional[Dict[str, Any]]:
+    # 解析日志中的一行，不完整或为空时返回None
+    if not line.endswith('\n'):
+        return None
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError:
+        return None
+
+
+def _write_json_array(f, words: Iterable[Word]) -> None:
+    # 逐个写入单词，输出与 json.dump(..., indent=2) 相同
+    first: bool = True
+    f.write('[')
+    for word in words:
+        f.write('\n  ' if first else ',\n  ')
+        f.write(json.dumps(word.to_dict(), ensure_ascii=False, indent=2).replace('\n', '\n  '))
+        first = False
+    f.write(']' if first else '\n]')
+
+
+def _write_json_lines(f, words: Iterable[Word]) -> None:
+    for word in words:
+        f.write(json.dumps(word.to_dict(), ensure_ascii=False) + '\n')
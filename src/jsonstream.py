@@ -0,0 +1,103 @@
+"""JSON流式读取
+逐条解析JSON数组或JSON Lines文件中的记录，无需一次性将整个文件读入内存
+"""
+import json
+from typing import Any, Iterator, TextIO
+
+# 每次从文件读取的字符数
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = ' \t\n\r'
+
+
+def iter_json_array(fp: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    逐个解析顶层JSON数组中的元素
+
+    参数:
+        fp: 已打开的文本文件
+        chunk_size: 每次读取的字符数
+
+    返回:
+        依次产生数组中每个元素的迭代器
+
+    异常:
+        json.JSONDecodeError: 文件内容不是合法的JSON数组
+    """
+    decoder = json.JSONDecoder()
+    buffer: str = ''
+    position: int = 0
+    eof: bool = False
+
+    def fill() -> bool:
+        # 丢弃已解析的部分并读入下一块，文件结束时返回False
+        nonlocal buffer, position, eof
+        chunk: str = fp.read(chunk_size)
+        buffer = buffer[position:] + chunk
+        position = 0
+        eof = not chunk
+        return bool(chunk)
+
+    def skip_whitespace() -> None:
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position < len(buffer) or not fill():
+                return
+
+    skip_whitespace()
+    if buffer[position:position + 1] != '[':
+        raise json.JSONDecodeError("Expecting '['", buffer, position)
+    position += 1
+
+    skip_whitespace()
+    if buffer[position:position + 1] == ']':
+        return
+
+    while True:
+        # 解析一个元素，数据不完整时继续读取
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if fill():
+                    continue
+                raise
+            # 数字可能在块末尾被截断（如"1500."只解析出1500），需读到分隔符才能确定
+            truncated: bool = end == len(buffer) or (
+                isinstance(value, (int, float)) and buffer[end] not in _WHITESPACE + ',]')
+            if truncated and not eof and fill():
+                continue
+            break
+        position = end
+        yield value
+
+        skip_whitespace()
+        delimiter: str = buffer[position:position + 1]
+        position += 1
+        if delimiter == ']':
+            return
+        if delimiter != ',':
+            raise json.JSONDecodeError("Expecting ',' delimiter", buffer, position - 1)
+        skip_whitespace()
+
+
+def iter_json_lines(fp: TextIO) -> Iterator[Any]:
+    """
+    逐行解析JSON Lines文件，忽略空行
+
+    参数:
+        fp: 已打开的文本文件
+
+    返回:
+        依次产生每行记录的迭代器
+    """
+    for line_number, line in enumerate(fp, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise json.JSONDecodeError(f"line {line_number}: {e.msg}", e.doc, e.pos) from None
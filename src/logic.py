@@ -1,90 +1,774 @@
 import sys
 import os
-import json
-from typing import List, Optional, Dict
+import errno
+import functools
+import heapq
+import itertools
+import threading
+from bisect import bisect_left, insort
+from typing import Any, List, Optional, Dict, Iterable, Iterator, Callable, Set, Tuple
 from word import Word, Definition, Example
-from algo import ratio, partial_ratio
-from settings import WORDS_PATH, SEARCH_SIMILARITY
+from algo import ratio, levenshtein_distance, similarity_to_max_distance,\
+    ratio_many, has_numpy, extract, EncodedChoices
+from index import BKTree, Trie, FuzzySession, gc_paused
+from textindex import TextIndex
+from phonetic import PhoneticIndex
+from cache import LRUCache
+from storage import WordStorage, SnapshotStorage, open_storage
+from snapshot import Snapshot, SnapshotWords, SnapshotFoldedWords, SnapshotSpellings
+from profiling import instrument, profiler
+from importer import ImportReport, parse_record, IMPORT_BATCH_SIZE
+from settings import WORDS_PATH, SEARCH_SIMILARITY, SEARCH_CACHE_SIZE,\
+    PARALLEL_SEARCH_ENABLED, PARALLEL_SEARCH_WORKERS, PARALLEL_SEARCH_MIN_WORDS,\
+    PHONETIC_SEARCH_ENABLED, PHONETIC_EXHAUSTIVE
+
+# 加载单词时每隔多少条记录报告一次进度
+LOAD_PROGRESS_INTERVAL = 1000
+
+# 批量导入的新单词不超过现有单词数的该比例时逐个更新已建索引，否则丢弃索引待下次使用时整体重建
+BULK_INDEX_UPDATE_RATIO = 0.1
+
+# 全文索引中释义与例句（原句、译句）的词频权重
+TEXT_MEANING_WEIGHT = 2.0
+TEXT_EXAMPLE_WEIGHT = 1.0
+
+
+class _SearchCandidates:
+    """
+    一个关键词的全部匹配及已排好序的结果前缀，缓存在LRU中，翻页时只需补充排序
+    fuzzy为模糊匹配的 拼写 -> 相似度（已打分），substring为其余子串匹配的拼写（按长度、拼写排序，尚未打分）
+    """
+
+    def __init__(self, fuzzy: Dict[str, float], substring: List[str]) -> None:
+        self.fuzzy: Dict[str, float] = fuzzy
+        self.substring: List[str] = substring
+        self.ranked: List[str] = []
+
+    @property
+    def total(self) -> int:
+        return len(self.fuzzy) + len(self.substring)
+
+
+def _after_load(method: Callable) -> Callable:
+    # 访问单词数据的公共方法先等待后台加载完成（加载线程自身回放日志时除外）
+    @functools.wraps(method)
+    def wrapper(self: 'WordManager', *args, **kwargs):
+        if self._loader is not None:
+            self.wait_until_loaded()
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _writable(method: Callable) -> Callable:
+    # 修改单词数据的方法在只读快照模式下不执行，打印错误并返回False
+    @functools.wraps(method)
+    def wrapper(self: 'WordManager', *args, **kwargs):
+        if self._snapshot is not None:
+            print("词库以只读快照方式打开，无法修改", file=sys.stderr)
+            return False
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+# 单词表、各索引、快照和未保存的修改操作的属性名，加载新词库时整体取下，失败时整体换回
+# （回放日志经由公开的修改方法，会记录修改操作，回放中途失败时这些操作不能留在原词库的待保存列表中）
+_STATE_FIELDS = ('_words', '_folded_words', '_sorted_spellings', '_bktree', '_phonetic',
+                 '_trie', '_text_index', '_encoded', '_snapshot', '_pending_ops')
+
 
 class WordManager:
-    def __init__(self) -> None:
-        self.words: List[Word] = []
-        self.load_words(WORDS_PATH)
-        
+    def __init__(self, background: bool = False) -> None:
+        # 拼写 -> 单词，按插入顺序保存全部单词
+        self._words: Dict[str, Word] = {}
+        # 忽略大小写的拼写 -> {拼写: 单词}
+        self._folded_words: Dict[str, Dict[str, Word]] = {}
+        # 按字母序排列的拼写列表，首次按序访问时构建，之后随增删以二分插入/删除维护
+        self._sorted_spellings: Optional[List[str]] = None
+        # 拼写的BK树索引，首次模糊搜索时构建，之后随增删更新
+        self._bktree: Optional[BKTree] = None
+        # 拼写的规范化/语音键哈希桶，首次模糊搜索时构建，之后随增删更新
+        self._phonetic: Optional[PhoneticIndex] = None
+        # 拼写的前缀树，首次前缀查询时构建，之后随增删更新
+        self._trie: Optional[Trie] = None
+        # 拼写的批量编码缓存（需要numpy），单词增删后失效
+        self._encoded: Optional[EncodedChoices] = None
+        # 释义和例句的全文倒排索引（拼写 -> 文本），首次全文查询时构建，之后随单词内容的修改更新
+        self._text_index: Optional[TextIndex] = None
+        # 并行搜索的进程池，词库达到配置的规模时才启动
+        self._parallel: Optional['ParallelSearcher'] = None
+        # 单词集合的版本号，每次增删单词时递增，用于判断缓存是否过期
+        self._generation: int = 0
+        # 按需构建索引时持有的锁：服务端在共享读锁下并发执行查询，同一个索引只由一个线程构建
+        self._build_lock: threading.Lock = threading.Lock()
+        # 搜索结果缓存：(版本号, 规范化关键词) -> 结果列表
+        self._search_cache: LRUCache = LRUCache(SEARCH_CACHE_SIZE)
+        # 存储后端，保存时只提交上次保存以来的修改操作
+        self._storage: WordStorage = open_storage(WORDS_PATH)
+        # 上次保存以来尚未提交的修改操作
+        self._pending_ops: List[Dict[str, Any]] = []
+        # 以只读方式内存映射的二进制快照，加载*.snap文件时使用，此时单词表和索引都是快照上的视图
+        self._snapshot: Optional[Snapshot] = None
+        # 后台加载线程，加载完成并被等待过之后为None
+        self._loader: Optional[threading.Thread] = None
+        if background:
+            # 快速启动：在后台线程中加载词库，首次访问单词数据时才等待
+            self._loader = threading.Thread(target=self.load_words, args=(WORDS_PATH,),
+                                            name='word-loader', daemon=True)
+            self._loader.start()
+        else:
+            self.load_words(WORDS_PATH)
+
+    def is_read_only(self) -> bool:
+        # 是否以只读快照方式打开了词库
+        return self._snapshot is not None
+
+    def is_loaded(self) -> bool:
+        # 后台加载是否已经完成（未使用后台加载时总为True）
+        loader: Optional[threading.Thread] = self._loader
+        return loader is None or not loader.is_alive()
+
+    def wait_until_loaded(self) -> None:
+        # 等待后台加载完成
+        loader: Optional[threading.Thread] = self._loader
+        if loader is not None and loader is not threading.current_thread():
+            loader.join()
+            self._loader = None
+
+    @property
+    @_after_load
+    def words(self) -> List[Word]:
+        # 返回单词列表的副本（按插入顺序）
+        return list(self._words.values())
+
+    def _index_word(self, word: Word) -> None:
+        # 将单词加入各索引
+        self._words[word.spelling] = word
+        self._folded_words.setdefault(word.spelling.casefold(), {})[word.spelling] = word
+        if self._sorted_spellings is not None:
+            insort(self._sorted_spellings, word.spelling)
+        if self._bktree is not None:
+            self._bktree.add(word.spelling)
+        if self._phonetic is not None:
+            self._phonetic.add(word.spelling)
+        if self._trie is not None:
+            self._trie.add(word.spelling)
+        self._reindex_text(word)
+        self._encoded = None
+        self._generation += 1
+
+    def _unindex_word(self, word: Word) -> None:
+        # 将单词从各索引中移除
+        del self._words[word.spelling]
+        folded: str = word.spelling.casefold()
+        bucket: Dict[str, Word] = self._folded_words[folded]
+        del bucket[word.spelling]
+        if not bucket:
+            del self._folded_words[folded]
+        if self._sorted_spellings is not None:
+            del self._sorted_spellings[bisect_left(self._sorted_spellings, word.spelling)]
+        if self._bktree is not None:
+            self._bktree.remove(word.spelling)
+        if self._phonetic is not None:
+            self._phonetic.remove(word.spelling)
+        if self._trie is not None:
+            self._trie.remove(word.spelling)
+        if self._text_index is not None:
+            self._text_index.remove(word.spelling)
+        self._encoded = None
+        self._generation += 1
+
+    def _reset_indexes(self) -> None:
+        # 清空全部索引
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+        self._words = {}
+        self._folded_words = {}
+        self._sorted_spellings = None
+        self._bktree = None
+        self._phonetic = None
+        self._trie = None
+        self._text_index = None
+        self._encoded = None
+        self._generation += 1
+
+    def _detach_state(self) -> Dict[str, Any]:
+        # 取下当前的单词表和全部索引（不关闭快照），换上空表；返回取下的状态，供加载失败时原样恢复
+        state: Dict[str, Any] = {name: getattr(self, name) for name in _STATE_FIELDS}
+        self._snapshot = None
+        self._pending_ops = []
+        self._reset_indexes()
+        return state
+
+    def _restore_state(self, state: Dict[str, Any]) -> None:
+        # 丢弃当前的单词表和索引（关闭其中的快照），换回_detach_state取下的状态，不复制单词
+        if self._snapshot is not None:
+            self._snapshot.close()
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._generation += 1
+
+    @staticmethod
+    def _release_state(state: Dict[str, Any]) -> None:
+        # 新词库加载成功后释放取下的状态：关闭其中的快照
+        if state['_snapshot'] is not None:
+            state['_snapshot'].close()
+
+    def _mount_snapshot(self, snapshot: Snapshot) -> None:
+        # 以快照上的只读视图作为拼写表、忽略大小写的映射和有序拼写列表，不构建单词对象
+        self._snapshot = snapshot
+        self._words = SnapshotWords(snapshot)
+        self._folded_words = SnapshotFoldedWords(snapshot)
+        self._sorted_spellings = SnapshotSpellings(snapshot)
+        self._generation += 1
+
+    def _build_index(self, name: str, build: Callable[[], Any]) -> Any:
+        # 返回名为name的索引属性，为None时调用build构建
+        # 双重检查：已构建时不加锁；并发的查询同时发现索引未构建时，只有一个线程构建，其余等待后直接使用
+        index: Any = getattr(self, name)
+        if index is None:
+            with self._build_lock:
+                index = getattr(self, name)
+                if index is None:
+                    index = build()
+                    setattr(self, name, index)
+        return index
+
+    def _get_sorted_spellings(self) -> List[str]:
+        # 按需构建有序拼写列表（批量加载后只排序一次）
+        return self._build_index('_sorted_spellings', lambda: sorted(self._words))
+
+    def _get_bktree(self) -> BKTree:
+        # 按需构建BK树索引
+        return self._build_index('_bktree', lambda: BKTree(levenshtein_distance, self._words))
+
+    def _get_phonetic(self) -> PhoneticIndex:
+        # 按需构建语音键索引；全量模糊匹配时只用于查找读音相同的拼写，不需要取候选的键
+        def build() -> PhoneticIndex:
+            with gc_paused():
+                return PhoneticIndex(self._words, candidate_keys=not PHONETIC_EXHAUSTIVE)
+        return self._build_index('_phonetic', build)
+
+    def _get_trie(self) -> Trie:
+        # 按需构建前缀树
+        return self._build_index('_trie', lambda: Trie(self._words))
+
+    def _get_text_index(self) -> TextIndex:
+        # 按需构建全文索引
+        def build() -> TextIndex:
+            text_index = TextIndex(self._word_texts)
+            with gc_paused():
+                for word in self._words.values():
+                    text_index.add(word.spelling, self._word_text_fields(word))
+            return text_index
+        return self._build_index('_text_index', build)
+
+    def _word_texts(self, spelling: str) -> List[str]:
+        # 单词全部释义和例句的文本，供全文索引判断短语匹配
+        word: Optional[Word] = self._words.get(spelling)
+        return [text for text, _ in self._word_text_fields(word)] if word is not None else []
+
+    @staticmethod
+    def _word_text_fields(word: Word) -> List[Tuple[str, float]]:
+        # 单词参与全文索引的字段及权重：释义命中比例句命中更相关
+        fields: List[Tuple[str, float]] = []
+        for definition in word.definitions:
+            fields.append((definition.meaning, TEXT_MEANING_WEIGHT))
+            for example in definition.examples:
+                fields.append((example.original_sentence, TEXT_EXAMPLE_WEIGHT))
+                fields.append((example.translated_meaning, TEXT_EXAMPLE_WEIGHT))
+        return fields
+
+    def _reindex_text(self, word: Optional[Word]) -> None:
+        # 单词内容变化后更新其全文索引（索引尚未构建或单词不在词库中时无需更新）
+        if self._text_index is not None and word is not None and self._words.get(word.spelling) is word:
+            self._text_index.add(word.spelling, self._word_text_fields(word))
+
+    def _get_encoded(self) -> EncodedChoices:
+        # 按需将全部拼写编码为整数矩阵
+        return self._build_index('_encoded', lambda: EncodedChoices(list(self._words)))
+
+    def _fuzzy_scores(self, keyword: str) -> Tuple[Dict[str, float], int]:
+        # 返回相似度超过阈值的 拼写 -> 相似度，以及打分（计算编辑距离）的候选数
+        scores: Dict[str, float] = {}
+        if PARALLEL_SEARCH_ENABLED and len(self._words) >= PARALLEL_SEARCH_MIN_WORDS:
+            # 分片并行打分，分片数据只在单词集合变化后重新发布
+            # 与_build_index一样在构建锁内启动进程池和发布分片，并发的查询不会重复启动或同时写分片文件
+            with self._build_lock:
+                if self._parallel is None:
+                    # 进程池相关模块导入较慢，只在启用并行搜索时导入
+                    from parallel import ParallelSearcher
+                    self._parallel = ParallelSearcher(PARALLEL_SEARCH_WORKERS)
+                if not self._parallel.is_published(self._generation):
+                    self._parallel.publish(list(self._words), self._generation)
+                parallel: 'ParallelSearcher' = self._parallel
+            for score, spelling in parallel.search(keyword, SEARCH_SIMILARITY):
+                scores[spelling] = score
+            return scores, len(self._words)
+
+        if has_numpy():
+            # 向量化批量打分，阈值过滤在结果数组上完成
+            encoded: EncodedChoices = self._get_encoded()
+            batch_scores = ratio_many(keyword, encoded, score_cutoff=SEARCH_SIMILARITY)
+            for i in (batch_scores > SEARCH_SIMILARITY).nonzero()[0]:
+                scores[encoded.choices[i]] = float(batch_scores[i])
+            return scores, len(encoded.choices)
+
+        # 将相似度阈值换算为编辑距离上界，在BK树中做有界查询
+        max_distance: Optional[int] = similarity_to_max_distance(len(keyword), SEARCH_SIMILARITY)
+        if max_distance is None:
+            candidates = [(levenshtein_distance(keyword, spelling), spelling) for spelling in self._words]
+            evaluations: int = len(candidates)
+        else:
+            candidates, evaluations = self._get_bktree().query(keyword, max_distance)
+        for distance, spelling in candidates:
+            score: float = round(1 - distance / max(len(keyword), len(spelling)), 2)
+            if score > SEARCH_SIMILARITY:
+                scores[spelling] = score
+        return scores, evaluations
+
+    def _phonetic_scores(self, keyword: str, exhaustive: bool) -> Tuple[Dict[str, float], int]:
+        # 借助语音键索引查找模糊匹配，返回 (拼写 -> 相似度, 打分的候选数)
+        # 折叠形式或读音键与关键词完全相同的拼写总是匹配（如fone -> phone、cafe -> café），
+        # 其余候选与_fuzzy_scores一样，相似度超过SEARCH_SIMILARITY才匹配；
+        # exhaustive为True时先由_fuzzy_scores（并行、numpy批量或BK树）对全部单词打分，再补充读音相同的拼写，
+        # 为False时只对与关键词共享桶键的拼写打分，不扫描整个词库，但会漏掉相差两处的拼写
+        phonetic: PhoneticIndex = self._get_phonetic()
+        scores: Dict[str, float]
+        scored: int
+        if exhaustive:
+            scores, scored = self._fuzzy_scores(keyword)
+        else:
+            scores = {}
+            candidates: Set[str] = phonetic.candidates(keyword)
+            scored = len(candidates)
+            for spelling in candidates:
+                score: float = ratio(keyword, spelling, score_cutoff=SEARCH_SIMILARITY)
+                if score > SEARCH_SIMILARITY:
+                    scores[spelling] = score
+        for spelling in phonetic.equivalents(keyword):
+            if spelling not in scores:
+                scores[spelling] = ratio(keyword, spelling)
+                scored += 1
+        return scores, scored
+
+    def _record(self, op: str, **fields: str) -> None:
+        # 记录一次修改操作，保存时追加到日志
+        self._pending_ops.append(dict(op=op, **fields))
+
+    def _apply_op(self, op: Dict[str, Any]) -> None:
+        # 回放日志中的一次修改操作，目标不存在时忽略
+        kind: str = op.get('op', '')
+        if kind == 'clear_all':
+            self.clear_all()
+            return
+        if kind == 'add_word':
+            self.add_word(op['spelling'])
+            return
+
+        word: Optional[Word] = self._words.get(op['spelling'])
+        if word is None:
+            return
+        if kind == 'del_word':
+            self.del_word(word)
+            return
+        if kind == 'add_definition':
+            self.add_definition_to_word(word, Definition(word, op['pos'], op['meaning']))
+            return
+
+        target = Definition(word, op['pos'], op['meaning'])
+        definition: Optional[Definition] = next((d for d in word.definitions if d == target), None)
+        if definition is None:
+            return
+        if kind == 'del_definition':
+            self.del_definition_from_word(word, definition)
+        elif kind == 'modify_definition':
+            self.modify_definition(definition, op['new_pos'], op['new_meaning'])
+        elif kind == 'add_example':
+            self.add_example_to_definition(definition, op['original_sentence'], op['translated_meaning'])
+        elif kind == 'del_example':
+            example_target = Example(word, op['original_sentence'], op['translated_meaning'])
+            example: Optional[Example] = next((e for e in definition.examples if e == example_target), None)
+            if example is not None:
+                self.del_example_from_definition(definition, example)
+
+    @instrument('WordManager.add_word')
+    @_after_load
+    @_writable
     def add_word(self, spelling: str) -> bool:
         # 业务规则校验：非空且不重复
         if spelling and isinstance(spelling, str):
             spelling = spelling.strip()
             # 检查单词是否已存在（通过拼写）
-            if not any(word.spelling == spelling for word in self.words):
-                self.words.append(Word(spelling))
+            if spelling and spelling not in self._words:
+                self._index_word(Word(spelling))
+                self._record('add_word', spelling=spelling)
                 return True
         return False
 
+    @instrument('WordManager.bulk_import')
+    @_after_load
+    def bulk_import(self, records: Iterable[Any], report: Optional[ImportReport] = None,
+                    progress: Optional[Callable[[ImportReport], None]] = None,
+                    batch_size: int = IMPORT_BATCH_SIZE) -> ImportReport:
+        """
+        批量导入单词、释义和例句（记录格式见importer.parse_record），与已有数据合并
+        去重使用按单词建立的哈希集合，每条记录的开销与词库规模无关；
+        新单词只加入拼写表，有序列表、BK树、前缀树等索引在导入结束时统一更新一次
+        参数:
+            records (Iterable[Any]): 导入记录
+            report (ImportReport): 累加统计结果的报告，默认新建
+            progress (Callable[[ImportReport], None]): 每合并一批记录后调用
+            batch_size (int): 每批记录数
+        返回:
+            ImportReport: 导入统计，无效记录被拒绝而不中断导入
+        """
+        report = report if report is not None else ImportReport()
+        if self._snapshot is not None:
+            report.reject("词库以只读快照方式打开，无法导入")
+            report.finish()
+            return report
+        # 拼写 -> {(词性, 释义): (释义对象, {(原句, 译句)})}，只为导入涉及的单词建立
+        merged: Dict[str, Dict[Tuple[str, str], Tuple[Definition, Set[Tuple[str, str]]]]] = {}
+        new_words: List[Word] = []
+        # 导入期间会创建大量不构成引用环的对象，暂停循环垃圾回收
+        with gc_paused():
+            try:
+                batch: List[Tuple[str, List[Tuple[str, str, List[Tuple[str, str]]]]]] = []
+                for record in records:
+                    report.records += 1
+                    try:
+                        batch.append(parse_record(record))
+                    except ValueError as e:
+                        report.reject(str(e))
+                    if len(batch) >= batch_size:
+                        self._merge_import_batch(batch, merged, new_words, report)
+                        batch = []
+                        if progress is not None:
+                            progress(report)
+                self._merge_import_batch(batch, merged, new_words, report)
+            finally:
+                # 读取中途出错时已合并的部分同样生效，索引需与拼写表保持一致
+                self._finish_bulk_import(new_words, merged)
+                report.finish()
+        return report
+
+    def _merge_import_batch(self, batch: List[Tuple[str, List[Tuple[str, str, List[Tuple[str, str]]]]]],
+                            merged: Dict[str, Dict[Tuple[str, str], Tuple[Definition, Set[Tuple[str, str]]]]],
+                            new_words: List[Word], report: ImportReport) -> None:
+        # 合并一批已校验的记录
+        for spelling, definitions in batch:
+            changed: bool = False
+            word: Optional[Word] = self._words.get(spelling)
+            if word is None:
+                word = Word(spelling)
+                self._words[spelling] = word
+                self._folded_words.setdefault(spelling.casefold(), {})[spelling] = word
+                new_words.append(word)
+                self._record('add_word', spelling=spelling)
+                report.words_added += 1
+                changed = True
+
+            known = merged.get(spelling)
+            if known is None:
+                known = merged[spelling] = {
+                    (d.pos, d.meaning): (d, {(e.original_sentence, e.translated_meaning) for e in d.examples})
+                    for d in word.definitions
+                }
+            for pos, meaning, examples in definitions:
+                entry = known.get((pos, meaning))
+                if entry is None:
+                    definition = Definition(word, pos, meaning)
+                    word.definitions.append(definition)
+                    self._record('add_definition', spelling=spelling, pos=definition.pos, meaning=definition.meaning)
+                    entry = known[(pos, meaning)] = (definition, set())
+                    report.definitions_added += 1
+                    changed = True
+                definition, seen_examples = entry
+                for original_sentence, translated_meaning in examples:
+                    if (original_sentence, translated_meaning) in seen_examples:
+                        continue
+                    seen_examples.add((original_sentence, translated_meaning))
+                    example = Example(word, original_sentence, translated_meaning)
+                    definition.examples.append(example)
+                    self._record_example('add_example', definition, example)
+                    report.examples_added += 1
+                    changed = True
+            if not changed:
+                report.duplicates += 1
+
+    def _finish_bulk_import(self, new_words: List[Word], touched: Iterable[str]) -> None:
+        # 批量导入结束后一次性更新索引，touched为导入涉及的全部拼写
+        if self._text_index is not None:
+            touched = list(touched)
+            if len(touched) <= len(self._words) * BULK_INDEX_UPDATE_RATIO:
+                for spelling in touched:
+                    self._reindex_text(self._words[spelling])
+            else:
+                self._text_index = None
+        if not new_words:
+            return
+        if len(new_words) <= len(self._words) * BULK_INDEX_UPDATE_RATIO:
+            for word in new_words:
+                if self._sorted_spellings is not None:
+                    insort(self._sorted_spellings, word.spelling)
+                if self._bktree is not None:
+                    self._bktree.add(word.spelling)
+                if self._phonetic is not None:
+                    self._phonetic.add(word.spelling)
+                if self._trie is not None:
+                    self._trie.add(word.spelling)
+        else:
+            self._sorted_spellings = None
+            self._bktree = None
+            self._phonetic = None
+            self._trie = None
+        self._encoded = None
+        self._generation += 1
+
+    @instrument('WordManager.del_word')
+    @_after_load
+    @_writable
     def del_word(self, word: Word) -> bool:
         # 业务规则校验：存在
-        if isinstance(word, Word) and word in self.words:
-            self.words.remove(word)
+        if isinstance(word, Word) and word.spelling in self._words:
+            self._unindex_word(self._words[word.spelling])
+            self._record('del_word', spelling=word.spelling)
             return True
         return False
 
+    @instrument('WordManager.get_word')
+    @_after_load
+    def get_word(self, spelling: str) -> Optional[Word]:
+        # 按拼写精确查找单词
+        return self._words.get(spelling.strip()) if isinstance(spelling, str) else None
+
+    @instrument('WordManager.get_words_ignore_case')
+    @_after_load
+    def get_words_ignore_case(self, spelling: str) -> List[Word]:
+        # 按拼写查找单词（忽略大小写）
+        if not isinstance(spelling, str):
+            return []
+        return list(self._folded_words.get(spelling.strip().casefold(), {}).values())
+
+    @instrument('WordManager.add_definition_to_word')
+    @_after_load
+    @_writable
     def add_definition_to_word(self, word: Word, definition: Definition) -> bool:
         # 业务规则校验：不重复
         if isinstance(word, Word) and isinstance(definition, Definition):
             # 检查释义是否已存在
             if all(ori_definition != definition for ori_definition in word.definitions):
                 word.definitions.append(definition)
+                self._reindex_text(word)
+                self._record('add_definition', spelling=word.spelling, pos=definition.pos, meaning=definition.meaning)
                 return True
         return False
 
+    @instrument('WordManager.del_definition_from_word')
+    @_after_load
+    @_writable
     def del_definition_from_word(self, word: Word, definition: Definition) -> bool:
         # 业务规则校验：存在
         if isinstance(word, Word) and isinstance(definition, Definition):
             # 检查释义是否存在
             if definition in word.definitions:
                 word.del_definition(definition)
+                self._reindex_text(word)
+                self._record('del_definition', spelling=word.spelling, pos=definition.pos, meaning=definition.meaning)
                 return True
         return False
         
+    @instrument('WordManager.get_all_words')
+    @_after_load
     def get_all_words(self) -> List[Word]:
         # 返回按拼写排序后的单词列表
-        return sorted(self.words, key=lambda word: word.spelling)
+        return [self._words[spelling] for spelling in self._get_sorted_spellings()]
+
+    @_after_load
+    def get_word_count(self) -> int:
+        # 返回单词总数
+        return len(self._words)
+
+    @instrument('WordManager.get_words_page')
+    @_after_load
+    def get_words_page(self, offset: int, limit: int) -> List[Word]:
+        # 返回按拼写排序后从offset开始的至多limit个单词
+        if offset < 0 or limit <= 0:
+            return []
+        return [self._words[spelling] for spelling in self._get_sorted_spellings()[offset:offset + limit]]
+
+    @_after_load
+    def iter_words_from(self, spelling: str) -> Iterator[Word]:
+        # 按拼写顺序逐个返回不小于给定拼写的单词
+        sorted_spellings: List[str] = self._get_sorted_spellings()
+        position: int = bisect_left(sorted_spellings, spelling)
+        while position < len(sorted_spellings):
+            yield self._words[sorted_spellings[position]]
+            position += 1
 
     def is_valid_spelling(self, spelling: str) -> bool:
         # 检查拼写是否有效（非空字符串）
         return spelling and isinstance(spelling, str)
 
-    def is_word_exists(self, spelling: str) -> bool:
+    @instrument('WordManager.is_word_exists')
+    @_after_load
+    def is_word_exists(self, spelling: str, case_sensitive: bool = True) -> bool:
         # 检查单词是否存在（通过拼写）
-        return any(word.spelling == spelling for word in self.words)
+        if not isinstance(spelling, str):
+            return False
+        if case_sensitive:
+            return spelling in self._words
+        return spelling.casefold() in self._folded_words
+
+    def _get_search_candidates(self, keyword: str) -> _SearchCandidates:
+        # 查找关键词的全部匹配：模糊匹配在查找时即已打分，子串匹配留到排序时按需打分
+        # 缓存键包含版本号，单词集合变化后旧结果不会再被命中，随LRU淘汰
+        cache_key = (self._generation, keyword)
+        candidates: Optional[_SearchCandidates] = self._search_cache.get(cache_key)
+        if candidates is not None:
+            return candidates
+
+        # 模糊匹配：拼写 -> 相似度，每个候选只计算一次
+        scores: Dict[str, float]
+        scored: int
+        if PHONETIC_SEARCH_ENABLED:
+            scores, scored = self._phonetic_scores(keyword, PHONETIC_EXHAUSTIVE)
+        else:
+            scores, scored = self._fuzzy_scores(keyword)
 
-    def search_words(self, keyword: str) -> List[Word]:
-        # 按拼写搜索并排序
+        # 子串匹配（忽略大小写）
+        keyword_folded: str = keyword.casefold()
+        substring: List[str] = [spelling for folded, bucket in self._folded_words.items() if keyword_folded in folded
+                                for spelling in bucket if spelling not in scores]
+        substring.sort(key=lambda spelling: (len(spelling), spelling))
+        candidates = _SearchCandidates(scores, substring)
+        profiler.observe('search_words.candidates', scored)
+        profiler.observe('search_words.results', candidates.total)
+        self._search_cache.put(cache_key, candidates)
+        return candidates
+
+    def _rank_search_results(self, keyword: str, candidates: _SearchCandidates, limit: Optional[int]) -> List[str]:
+        # 返回相似度最高的至多limit个拼写，相似度相同时较短的在前，再按拼写排序
+        order = lambda item: (-item[1], len(item[0]), item[0])
+        if limit is None or limit >= candidates.total:
+            fuzzy: List[Tuple[str, float]] = sorted(candidates.fuzzy.items(), key=order)
+            limit = None
+        else:
+            fuzzy = heapq.nsmallest(limit, candidates.fuzzy.items(), key=order)
+        # 模糊匹配已凑满limit个时，子串匹配的候选不低于其中最低的相似度才可能入选
+        cutoff: float = fuzzy[-1][1] if limit is not None and len(fuzzy) == limit else 0.0
+        # 子串匹配的候选已按长度、拼写排序，extract对相似度相同者保持该顺序，与order一致
+        substring: List[Tuple[str, float]] = extract(keyword, candidates.substring, limit, cutoff)
+        return [spelling for spelling, _ in itertools.islice(heapq.merge(fuzzy, substring, key=order), limit)]
+
+    @instrument('WordManager.search_words')
+    @_after_load
+    def search_words(self, keyword: str, limit: Optional[int] = None) -> List[Word]:
+        """
+        按拼写搜索：拼写包含关键词（忽略大小写）或与关键词足够相似的单词，按相似度降序排列
+        指定limit时只对可能进入前limit名的候选排序（堆选择，子串匹配的候选带截断阈值打分），
+        已排好的结果前缀随缓存保留，翻页时只需补充
+        参数:
+            keyword (str): 关键词
+            limit (int): 最多返回的单词数，默认全部
+        返回:
+            List[Word]: 匹配的单词
+        """
+        keyword = keyword.strip() if isinstance(keyword, str) else ""
+        if not keyword or (limit is not None and limit <= 0):
+            return []
+
+        candidates: _SearchCandidates = self._get_search_candidates(keyword)
+        # 缓存的结果可能被并发的查询（服务端在共享读锁下执行）替换，只使用本次读到或排出的列表
+        ranked: List[str] = candidates.ranked
+        if len(ranked) < candidates.total and (limit is None or len(ranked) < limit):
+            ranked = self._rank_search_results(keyword, candidates, limit)
+            # 只在比缓存的前缀更长时写回，较短的结果不会覆盖并发查询排出的较长结果
+            if len(ranked) > len(candidates.ranked):
+                candidates.ranked = ranked
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self._words[spelling] for spelling in ranked]
+
+    @instrument('WordManager.count_search_results')
+    @_after_load
+    def count_search_results(self, keyword: str) -> int:
+        # 返回search_words的结果总数，无需对结果打分排序
+        keyword = keyword.strip() if isinstance(keyword, str) else ""
         if not keyword:
+            return 0
+        return self._get_search_candidates(keyword).total
+
+    @instrument('WordManager.search_text')
+    @_after_load
+    def search_text(self, query: str, limit: Optional[int] = None) -> List[Word]:
+        """
+        在释义和例句（原句及译句）中全文查找，返回包含查询中全部词项的单词，按相关度降序排列
+        英文按单词匹配（忽略大小写），中文按单字和相邻两字匹配；包含完整查询文本的单词排在最前
+        参数:
+            query (str): 查询文本，如"影响"或"take into account"
+            limit (int): 最多返回的单词数，默认全部
+        返回:
+            List[Word]: 匹配的单词
+        """
+        if not isinstance(query, str) or not query.strip():
             return []
-        keyword_lower: str = keyword.lower()
-        results: List[Word] = [word for word in self.words if\
-            keyword_lower in word.spelling.lower() or\
-            ratio(keyword, word.spelling) > SEARCH_SIMILARITY]
-        results.sort(key=lambda x: (
-            ratio(keyword, x.spelling),
-            len(x.spelling)
-        ))
-        return results
+        return [self._words[spelling] for _, spelling in self._get_text_index().search(query, limit)]
+
+    @instrument('WordManager.complete')
+    @_after_load
+    def complete(self, prefix: str, limit: int = 10, offset: int = 0) -> List[Word]:
+        # 按字典序返回以给定前缀开头（忽略大小写）的单词，offset用于分页
+        if not isinstance(prefix, str):
+            return []
+        return [self._words[spelling] for spelling in self._get_trie().complete(prefix.strip(), limit, offset)]
+
+    @_after_load
+    def start_fuzzy_session(self, max_distance: int = 2) -> FuzzySession:
+        # 创建边输入边搜索的增量模糊查询会话（忽略大小写），单词增删后自动重算
+        return FuzzySession(self._get_trie, max_distance)
+
+    @instrument('WordManager.count_prefix')
+    @_after_load
+    def count_prefix(self, prefix: str) -> int:
+        # 返回以给定前缀开头（忽略大小写）的单词数
+        if not isinstance(prefix, str):
+            return 0
+        return self._get_trie().count_prefix(prefix.strip())
+
+    def search_cache_info(self) -> Dict[str, int]:
+        # 返回搜索缓存的统计信息
+        return self._search_cache.info()
         
+    @instrument('WordManager.clear_all')
+    @_after_load
+    @_writable
     def clear_all(self) -> None:
-        self.words = []
+        self._reset_indexes()
+        self._record('clear_all')
 
+    @instrument('WordManager.modify_definition')
+    @_after_load
+    @_writable
     def modify_definition(self, definition: Definition, pos: str, meaning: str) -> bool:
         # 业务规则校验：存在且不重复
-        if isinstance(definition, Definition) and pos and meaning:
-            # 检查释义是否已存在
-            if all(ori_definition != definition for ori_definition in definition.parentWord.definitions):
-                definition.pos = pos
-                definition.meaning = meaning
+        if isinstance(definition, Definition) and definition.parentWord is not None and pos and meaning:
+            word: Word = definition.parentWord
+            modified = Definition(word, pos, meaning)
+            # 检查修改后的释义是否与该单词的其他释义重复
+            if all(ori_definition is definition or ori_definition != modified for ori_definition in word.definitions):
+                self._record('modify_definition', spelling=word.spelling, pos=definition.pos,
+                             meaning=definition.meaning, new_pos=modified.pos, new_meaning=modified.meaning)
+                definition.pos = modified.pos
+                definition.meaning = modified.meaning
+                self._reindex_text(word)
                 return True
         return False
 
+    @instrument('WordManager.add_example_to_definition')
+    @_after_load
+    @_writable
     def add_example_to_definition(self, definition: Definition, original_sentence: str, translated_meaning: str) -> bool:
         example = Example(definition.parentWord, original_sentence, translated_meaning)
         # 业务规则校验：存在且不重复
@@ -92,100 +776,178 @@ class WordManager:
             # 检查例句是否已存在
             if all(ori_example != example for ori_example in definition.examples):
                 definition.add_example(example)
+                self._reindex_text(definition.parentWord)
+                self._record_example('add_example', definition, example)
                 return True
         return False
 
+    @instrument('WordManager.del_example_from_definition')
+    @_after_load
+    @_writable
     def del_example_from_definition(self, definition: Definition, example: Example) -> bool:
         # 业务规则校验：存在
         if isinstance(definition, Definition) and isinstance(example, Example):
             # 检查例句是否存在
             if example in definition.examples:
                 definition.del_example(example)
+                self._reindex_text(definition.parentWord)
+                self._record_example('del_example', definition, example)
                 return True
         return False
+
+    def _record_example(self, op: str, definition: Definition, example: Example) -> None:
+        # 记录例句的修改操作（释义已不属于任何单词时无需记录）
+        if definition.parentWord is not None:
+            self._record(op, spelling=definition.parentWord.spelling, pos=definition.pos,
+                         meaning=definition.meaning, original_sentence=example.original_sentence,
+                         translated_meaning=example.translated_meaning)
     
+    @instrument('WordManager.save_words')
+    @_after_load
     def save_words(self) -> bool:
         """
-        将当前单词列表保存到JSON文件
+        将上次保存以来的修改提交到存储后端
+        JSON文件只追加修改日志（必要时压缩为新快照），SQLite在一个事务中逐条更新
         返回: 保存成功返回True，失败返回False
         """
         try:
-            # 构建保存路径
-            file_path = os.path.join(os.path.dirname(__file__), 'words.json')
-            
-            # 转换单词数据为JSON可序列化格式
-            words_data = []
-            for word in self.words:
-                definitions = []
-                for definition in word.definitions:
-                    examples = [{
-                        'original_sentence': example.original_sentence,
-                        'translated_meaning': example.translated_meaning
-                    } for example in definition.examples]
-                    
-                    definitions.append({
-                        'pos': definition.pos,
-                        'meaning': definition.meaning,
-                        'examples': examples
-                    })
-                
-                words_data.append({
-                    'spelling': word.spelling,
-                    'definitions': definitions
-                })
-            
-            # 写入JSON文件
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(words_data, f, ensure_ascii=False, indent=2)
-            
+            self._storage.commit(self._pending_ops, self._words.values)
+            self._pending_ops = []
             return True
         except Exception as e:
             print(f"保存单词失败: {str(e)}", file=sys.stderr)
             return False
 
-    def load_words(self, file_path: str) -> bool:
+    @instrument('WordManager.compact')
+    @_after_load
+    def compact(self) -> None:
         """
-        从指定路径加载单词数据
+        将全部单词整体写入存储后端（JSON文件写入新快照并清空日志）
+        异常: 写入失败时抛出异常，原数据保持不变
+        """
+        self._storage.write_all(self._words.values())
+        self._pending_ops = []
+
+    @_after_load
+    def close(self) -> None:
+        """释放存储后端、只读快照的内存映射和并行搜索进程池"""
+        self._storage.close()
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+        if self._parallel is not None:
+            self._parallel.close()
+            self._parallel = None
+
+    @instrument('WordManager.save_words_as')
+    @_after_load
+    def save_words_as(self, file_path: str) -> bool:
+        """
+        将全部单词写入新的存储位置，之后的保存都写入该位置
+        可用于在JSON与SQLite格式之间迁移
+        参数:
+            file_path (str): 目标文件路径，按扩展名选择存储格式
+        返回:
+            bool: 保存成功返回True，失败返回False
+        """
+        storage: WordStorage = open_storage(file_path)
+        try:
+            storage.write_all(self._words.values())
+        except Exception as e:
+            storage.close()
+            print(f"保存单词失败: {str(e)}", file=sys.stderr)
+            return False
+        self._storage.close()
+        self._storage = storage
+        self._pending_ops = []
+        return True
+
+    @instrument('WordManager.export_words')
+    @_after_load
+    def export_words(self, file_path: str) -> bool:
+        """
+        将全部单词导出到指定文件，之后的保存仍写入原存储位置
+        参数:
+            file_path (str): 目标文件路径，按扩展名选择存储格式
+        返回:
+            bool: 导出成功返回True，失败返回False
+        """
+        storage: WordStorage = open_storage(file_path)
+        try:
+            storage.write_all(self._words.values())
+            return True
+        except Exception as e:
+            print(f"导出单词失败: {str(e)}", file=sys.stderr)
+            return False
+        finally:
+            storage.close()
+
+    @instrument('WordManager.load_words')
+    @_after_load
+    def load_words(self, file_path: str, progress: Optional[Callable[[int], None]] = None) -> bool:
+        """
+        从指定路径流式加载单词数据，逐条构建单词并加入索引，然后回放尚未压缩的修改日志
+        支持JSON数组文件（words.json）、JSON Lines文件（*.jsonl，每行一个单词）
+        和SQLite数据库（*.db / *.sqlite / *.sqlite3）；
+        二进制快照（*.snap）直接内存映射，不构建单词对象，词库以只读方式打开
+        之后的保存都写入该文件
         参数:
             file_path (str): 单词数据文件路径
+            progress (Callable[[int], None]): 进度回调，参数为已加载的单词数
         返回:
-            bool: 加载成功返回True，失败返回False
+            bool: 加载成功返回True，失败返回False；失败时原有的单词表、索引和只读快照保持不变
         """
+        storage: WordStorage = open_storage(file_path)
+        # 加载前的单词表和索引，新数据在换上的空表中构建，成功后才释放
+        previous: Optional[Dict[str, Any]] = None
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                words_data = json.load(f)
-                
-            # 清空当前单词列表
-            self.words = []
-            
-            # 解析并添加单词
-            for word_data in words_data:
-                spelling = word_data['spelling']
-                definitions: List[Dict[str, str]] = word_data['definitions']
-                
-                # 创建单词实例
-                word = Word(spelling)
-                
-                # 添加释义
-                for def_data in definitions:
-                    pos = def_data['pos']
-                    meaning = def_data['meaning']
-                    definition = Definition(parent_word=word, pos=pos, meaning=meaning)
-                    
-                    # 添加例句
-                    for example_data in def_data.get('examples', []):
-                        original_sentence = example_data['original_sentence']
-                        translated_meaning = example_data['translated_meaning']
-                        example = Example(definition.parentWord, original_sentence, translated_meaning)
-                        definition.add_example(example)
-                    
-                    # 添加释义到单词
-                    word.add_definition(definition)
-                
-                self.words.append(word)
-                    
+            if not storage.exists():
+                raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), file_path)
+            if isinstance(storage, SnapshotStorage):
+                # 只读快照：内存映射后直接使用，打开耗时与词库规模无关
+                snapshot: Snapshot = storage.open()
+                previous = self._detach_state()
+                self._mount_snapshot(snapshot)
+                if storage is not self._storage:
+                    self._storage.close()
+                self._storage = storage
+                self._pending_ops = []
+                self._release_state(previous)
+                if progress is not None:
+                    progress(len(snapshot))
+                return True
+            words: Iterator[Word] = storage.iter_words()
+
+            # 换上空的单词表
+            previous = self._detach_state()
+
+            # 解析并添加单词；加载期间创建的大量对象不构成引用环，暂停循环垃圾回收
+            count: int = 0
+            with gc_paused():
+                for word in words:
+                    # 重复的拼写只保留第一次出现的单词
+                    if word.spelling not in self._words:
+                        self._index_word(word)
+                    count += 1
+                    if progress is not None and count % LOAD_PROGRESS_INTERVAL == 0:
+                        progress(count)
+
+                # 回放快照之后的修改操作
+                for op in storage.iter_ops():
+                    self._apply_op(op)
+            if storage is not self._storage:
+                self._storage.close()
+            self._storage = storage
+            self._pending_ops = []
+            self._release_state(previous)
+
+            if progress is not None and count % LOAD_PROGRESS_INTERVAL != 0:
+                progress(count)
             return True
         except Exception as e:
+            storage.close()
+            # 换回加载前的单词表和索引（包括已挂载的只读快照）
+            if previous is not None:
+                self._restore_state(previous)
             print(f"加载单词失败: {str(e)}", file=sys.stderr)
             return False
-            
\ No newline at end of file
@@ -1,26 +1,43 @@
+import time
+# 程序启动时刻（在导入其他模块之前），用于统计从启动到首次提示的耗时
+STARTED_AT: float = time.perf_counter()
+
+import sys
 from typing import Optional, Callable, Dict
 from ui import EnglishUI
 from logic import WordManager
 from word import Word, Definition, Example
+from profiling import profiler
+from settings import BACKGROUND_LOADING
 
 class EnglishCLI:
     def __init__(self) -> None:
-        self.word_manager: WordManager = WordManager()
+        # 快速启动模式下词库在后台加载，菜单无需等待加载完成即可显示
+        self.word_manager: WordManager = WordManager(background=BACKGROUND_LOADING)
         self.ui: EnglishUI = EnglishUI(self.word_manager)
         self.commands: Dict[str, Callable[[], None]] = {
             '1': self.ui.option_add_word,
             '2': self.ui.option_search_words,
-            '3': self.ui.option_list_words,
-            '4': self.ui.option_save_words,
-            '5': self.ui.option_exit_program
+            '3': self.ui.option_complete_words,
+            '4': self.ui.option_search_text,
+            '5': self.ui.option_list_words,
+            '6': self.ui.option_save_words,
+            '7': self.ui.option_exit_program,
+            EnglishUI.PROFILING_MENU_KEY: self.ui.option_profiling
         }
 
     def run(self) -> None:
         self.ui.greet_user()
+        # 启动耗时与词库规模无关，无论统计是否开启都记录，可在性能统计菜单中查看
+        profiler.record('EnglishCLI.startup', time.perf_counter() - STARTED_AT)
         while True:
             choice: str = self.ui.display_menu()
             self.ui.run_option(choice)
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # 带参数时执行非交互式子命令（见commands.py）
+        from commands import main
+        sys.exit(main(sys.argv[1:]))
     cli = EnglishCLI()
     cli.run()
\ No newline at end of file
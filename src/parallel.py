@@ -0,0 +1,135 @@
+"""多进程并行模糊搜索
+将拼写列表切分为若干分片，在常驻的工作进程中并行打分后合并结果
+每个工作进程固定负责一个分片，分片数据写入临时文件，只在单词集合变化后重新发布；
+工作进程按需读取并只缓存自己负责的分片
+"""
+import atexit
+import heapq
+import multiprocessing
+import os
+import pickle
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from algo import ratio, ratio_many, has_numpy, EncodedChoices
+
+# 工作进程内缓存的分片：(分片文件路径, 拼写列表, 批量编码)
+_worker_shard: Optional[Tuple[str, List[str], Optional[EncodedChoices]]] = None
+
+
+def _load_shard(path: str) -> Tuple[List[str], Optional[EncodedChoices]]:
+    # 工作进程读取分片（每个分片文件只读取一次）；工作进程只负责一个分片，新版本分片替换旧的
+    global _worker_shard
+    if _worker_shard is None or _worker_shard[0] != path:
+        # 先释放旧分片，读取新分片时内存中不同时保留两份
+        _worker_shard = None
+        with open(path, 'rb') as f:
+            spellings: List[str] = pickle.load(f)
+        _worker_shard = (path, spellings, EncodedChoices(spellings) if has_numpy() else None)
+    return _worker_shard[1], _worker_shard[2]
+
+
+def _score_shard(path: str, keyword: str, similarity: float) -> List[Tuple[float, str]]:
+    """
+    在工作进程中为一个分片打分
+
+    返回:
+        相似度超过阈值的 (相似度, 拼写) 列表，按相似度降序排列
+    """
+    spellings, encoded = _load_shard(path)
+    if encoded is not None:
+        scores = ratio_many(keyword, encoded, score_cutoff=similarity)
+        results = [(float(scores[i]), spellings[i]) for i in (scores > similarity).nonzero()[0]]
+    else:
+        results = []
+        for spelling in spellings:
+            score: float = ratio(keyword, spelling, score_cutoff=similarity)
+            if score > similarity:
+                results.append((score, spelling))
+    results.sort(reverse=True)
+    return results
+
+
+class ParallelSearcher:
+    """
+    常驻工作进程，对分片后的拼写列表并行计算相似度
+    每个分片固定交给一个单进程的执行器，工作进程只加载和缓存自己的分片，
+    总内存约为一份词库而不是工作进程数份
+    工作进程在首次搜索时启动并一直复用，程序退出时自动关闭
+    """
+
+    def __init__(self, workers: int = 0) -> None:
+        # 工作进程数（即分片数），0表示使用CPU核数
+        self.workers: int = workers if workers > 0 else (os.cpu_count() or 1)
+        # 第i个执行器只处理第i个分片
+        self._executors: List[ProcessPoolExecutor] = []
+        self._directory: Optional[str] = None
+        # 已发布分片对应的单词集合版本号及分片文件路径
+        self._generation: Optional[int] = None
+        self._shard_paths: List[str] = []
+        atexit.register(self.close)
+
+    def _start(self) -> List[ProcessPoolExecutor]:
+        if not self._executors:
+            # 使用spawn启动，避免在已有后台线程的进程中fork
+            context = multiprocessing.get_context('spawn')
+            self._executors = [ProcessPoolExecutor(1, mp_context=context) for _ in range(self.workers)]
+            self._directory = tempfile.mkdtemp(prefix='words-shards-')
+        return self._executors
+
+    def is_published(self, generation: int) -> bool:
+        """该版本的单词集合是否已发布，调用方可据此避免重复构建拼写列表"""
+        return generation == self._generation
+
+    def publish(self, spellings: List[str], generation: int) -> None:
+        """
+        发布新版本的拼写分片（单词集合未变化时不做任何事）
+
+        参数:
+            spellings: 全部拼写
+            generation: 单词集合的版本号
+        """
+        if self.is_published(generation):
+            return
+        self._start()
+        old_paths: List[str] = self._shard_paths
+        shard_size: int = max(1, -(-len(spellings) // self.workers))
+        self._shard_paths = []
+        for index, start in enumerate(range(0, len(spellings), shard_size)):
+            path: str = os.path.join(self._directory, f"g{generation}-{index}")
+            with open(path, 'wb') as f:
+                pickle.dump(spellings[start:start + shard_size], f, protocol=pickle.HIGHEST_PROTOCOL)
+            self._shard_paths.append(path)
+        self._generation = generation
+        # 旧分片已被工作进程读入内存或不再需要
+        for path in old_paths:
+            if path not in self._shard_paths and os.path.exists(path):
+                os.remove(path)
+
+    def search(self, keyword: str, similarity: float) -> List[Tuple[float, str]]:
+        """
+        在已发布的分片中并行搜索
+
+        参数:
+            keyword: 查询关键词
+            similarity: 相似度阈值，只返回超过该值的结果
+
+        返回:
+            (相似度, 拼写) 列表，按相似度降序排列
+        """
+        executors: List[ProcessPoolExecutor] = self._start()
+        futures = [executor.submit(_score_shard, path, keyword, similarity)
+                   for executor, path in zip(executors, self._shard_paths)]
+        return list(heapq.merge(*(future.result() for future in futures), reverse=True))
+
+    def close(self) -> None:
+        """关闭工作进程并删除分片文件"""
+        for executor in self._executors:
+            executor.shutdown(wait=True)
+        self._executors = []
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+        self._generation = None
+        self._shard_paths = []
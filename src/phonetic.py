@@ -0,0 +1,284 @@
+"""规范化与语音键
+为拼写计算几种"听起来相同或写法相近"的键，键相同的单词放在同一个哈希桶中。
+折叠形式或读音键与查询完全相同的拼写即使编辑距离较大也算匹配（如fone -> phone）；
+启用候选键时，还可以只在查询所在的桶中取候选计算编辑距离，不扫描整个词库
+
+  折叠形式  去掉变音符号并忽略大小写，如 Café -> cafe
+  删除邻域  折叠形式本身及删去任一字符后的形式，相差一次增、删、改或相邻交换的两个拼写
+            至少共享一个（如 apple、aple、appel 共享 aple；只用于取候选）
+  Soundex   首字母加三位辅音编码，如 Robert、Rupert -> R163（只用于取候选）
+  Metaphone 按英语发音规则转换的辅音骨架，如 phone、fone -> FN（只用于取候选）
+  读音键    保留元音的Metaphone编码，如 phone、fone -> FON，knight、nite -> NIT，
+            而apple（APL）与apply（APLI）、able（ABL）不同
+"""
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Set, Union
+
+_VOWELS = frozenset('AEIOU')
+# C、G在这些字母前发软音
+_FRONT_VOWELS = frozenset('EIY')
+# 与后面的H组成双字母音（CH、SH、PH、TH、GH），H本身不发音
+_H_DIGRAPHS = frozenset('CSPTG')
+# 单词开头这些双字母的第一个字母不发音
+_SILENT_INITIALS = ('AE', 'GN', 'KN', 'PN', 'WR')
+
+_SOUNDEX_CODES: Dict[str, str] = {
+    letter: digit
+    for letters, digit in (('BFPV', '1'), ('CGJKQSXZ', '2'), ('DT', '3'), ('L', '4'), ('MN', '5'), ('R', '6'))
+    for letter in letters
+}
+
+
+_NON_LETTERS = re.compile('[^A-Z]+')
+
+
+def fold(text: str) -> str:
+    """去掉变音符号并忽略大小写（casefold）"""
+    if text.isascii():
+        # ASCII文本没有变音符号，casefold与lower相同
+        return text.lower()
+    decomposed: str = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def _letters(folded: str) -> str:
+    # 折叠形式中的英文字母（大写），其他字符忽略
+    return _NON_LETTERS.sub('', folded.upper())
+
+
+def soundex(text: str) -> str:
+    """
+    美式Soundex编码：首字母加三位数字，不足补0；不含英文字母时返回空字符串
+    相邻的同码辅音（包括被H、W隔开的）只编码一次，元音会隔开同码辅音
+    """
+    return _soundex(_letters(fold(text)))
+
+
+def _soundex(letters: str) -> str:
+    if not letters:
+        return ''
+    code: List[str] = [letters[0]]
+    last: str = _SOUNDEX_CODES.get(letters[0], '')
+    for letter in letters[1:]:
+        digit: str = _SOUNDEX_CODES.get(letter, '')
+        if digit and digit != last:
+            code.append(digit)
+            if len(code) == 4:
+                break
+        if letter not in 'HW':
+            last = digit
+    return ''.join(code).ljust(4, '0')
+
+
+def metaphone(text: str, keep_vowels: bool = False) -> str:
+    """
+    Metaphone编码（Lawrence Philips的原始规则）：只保留开头的元音，其余字母按发音映射为辅音，
+    0表示TH音，X表示SH音；不含英文字母时返回空字符串
+    keep_vowels为True时保留全部元音（词尾不发音的E除外），不在元音前的Y记为I
+    """
+    return _metaphone(_letters(fold(text)), keep_vowels)
+
+
+def _metaphone(word: str, keep_vowels: bool) -> str:
+    if not word:
+        return ''
+    if word.startswith(_SILENT_INITIALS):
+        word = word[1:]
+    elif word[0] == 'X':
+        word = 'S' + word[1:]
+    elif word.startswith('WH'):
+        word = 'W' + word[2:]
+
+    length: int = len(word)
+    result: List[str] = []
+    for i, char in enumerate(word):
+        prev: str = word[i - 1] if i > 0 else ''
+        nxt: str = word[i + 1] if i + 1 < length else ''
+        after: str = word[i + 2] if i + 2 < length else ''
+        # 相邻的相同字母只处理一次（C除外，如ACCEPT）
+        if char == prev and char != 'C':
+            continue
+        if char in _VOWELS:
+            if i == 0 or (keep_vowels and not (char == 'E' and i == length - 1)):
+                result.append(char)
+        elif char == 'B':
+            # 词尾的MB中B不发音，如dumb
+            if not (prev == 'M' and i == length - 1):
+                result.append('B')
+        elif char == 'C':
+            if nxt == 'H' and prev == 'S':
+                result.append('K')
+            elif nxt == 'H' or (nxt == 'I' and after == 'A'):
+                result.append('X')
+            elif nxt in _FRONT_VOWELS:
+                # SCE、SCI、SCY中C不发音
+                if prev != 'S':
+                    result.append('S')
+            else:
+                result.append('K')
+        elif char == 'D':
+            result.append('J' if nxt == 'G' and after in _FRONT_VOWELS else 'T')
+        elif char == 'G':
+            if nxt == 'H' and after not in _VOWELS:
+                # 不在元音前的GH不发音，如night、through
+                pass
+            elif nxt == 'N' and (i + 2 == length or word[i + 2:] == 'ED'):
+                # 词尾的GN、GNED不发音，如sign、signed
+                pass
+            elif prev == 'D' and nxt in _FRONT_VOWELS:
+                # DGE等已按J编码
+                pass
+            elif nxt in _FRONT_VOWELS:
+                result.append('J')
+            else:
+                result.append('K')
+        elif char == 'H':
+            if prev in _H_DIGRAPHS or (prev in _VOWELS and nxt not in _VOWELS):
+                pass
+            else:
+                result.append('H')
+        elif char == 'K':
+            if prev != 'C':
+                result.append('K')
+        elif char == 'P':
+            result.append('F' if nxt == 'H' else 'P')
+        elif char == 'Q':
+            result.append('K')
+        elif char == 'S':
+            if nxt == 'H' or (nxt == 'I' and after in ('O', 'A')):
+                result.append('X')
+            else:
+                result.append('S')
+        elif char == 'T':
+            if nxt == 'I' and after in ('O', 'A'):
+                result.append('X')
+            elif nxt == 'H':
+                result.append('0')
+            elif not (nxt == 'C' and after == 'H'):
+                result.append('T')
+        elif char == 'V':
+            result.append('F')
+        elif char in 'WY':
+            # W、Y只在元音前发音
+            if nxt in _VOWELS:
+                result.append(char)
+            elif keep_vowels and char == 'Y' and i > 0:
+                result.append('I')
+        elif char == 'X':
+            result.append('KS')
+        elif char == 'Z':
+            result.append('S')
+        else:
+            # F J L M N R
+            result.append(char)
+    return ''.join(result)
+
+
+def sound_key(text: str) -> str:
+    """读音键：保留元音的Metaphone编码"""
+    return metaphone(text, keep_vowels=True)
+
+
+def _exact_keys(folded: str, letters: str) -> List[str]:
+    # 折叠形式和读音键，相同即视为同一个词的不同写法
+    keys: List[str] = []
+    if folded:
+        keys.append('f:' + folded)
+    code: str = _metaphone(letters, True)
+    if code:
+        keys.append('v:' + code)
+    return keys
+
+
+def phonetic_keys(spelling: str) -> List[str]:
+    """
+    拼写的全部桶键（带类型前缀，不同类型的键互不冲突），空键省略
+
+    参数:
+        spelling: 拼写
+
+    返回:
+        如 ['f:fone', 'v:FON', 'd:fone', 'd:one', 'd:fne', 'd:foe', 'd:fon', 's:F500', 'm:FN']
+    """
+    folded: str = fold(spelling)
+    letters: str = _letters(folded)
+    keys: List[str] = _exact_keys(folded, letters)
+    if folded:
+        keys.append('d:' + folded)
+        keys.extend(dict.fromkeys('d:' + folded[:i] + folded[i + 1:] for i in range(len(folded))))
+    code: str = _soundex(letters)
+    if code:
+        keys.append('s:' + code)
+    code = _metaphone(letters, False)
+    if code:
+        keys.append('m:' + code)
+    return keys
+
+
+class PhoneticIndex:
+    """
+    桶键 -> 拼写集合 的哈希索引，支持增删
+    查询时取与查询拼写共享任一桶键的全部拼写作为候选，耗时与候选数成正比，与词库规模无关
+    大部分桶（尤其是删除邻域的桶）只有一个拼写，这时直接保存拼写字符串而不是集合，以节省内存
+    candidate_keys为False时只保存折叠形式和读音键（只需要equivalents时），索引小得多，candidates不可用
+    """
+
+    def __init__(self, spellings: Iterable[str] = (), candidate_keys: bool = True) -> None:
+        self.candidate_keys: bool = candidate_keys
+        self._buckets: Dict[str, Union[str, Set[str]]] = {}
+        for spelling in spellings:
+            self.add(spelling)
+
+    def _keys(self, spelling: str) -> List[str]:
+        if self.candidate_keys:
+            return phonetic_keys(spelling)
+        folded: str = fold(spelling)
+        return _exact_keys(folded, _letters(folded))
+
+    def add(self, spelling: str) -> None:
+        buckets = self._buckets
+        for key in self._keys(spelling):
+            bucket: Union[str, Set[str], None] = buckets.get(key)
+            if bucket is None:
+                buckets[key] = spelling
+            elif isinstance(bucket, str):
+                if bucket != spelling:
+                    buckets[key] = {bucket, spelling}
+            else:
+                bucket.add(spelling)
+
+    def remove(self, spelling: str) -> None:
+        buckets = self._buckets
+        for key in self._keys(spelling):
+            bucket: Union[str, Set[str], None] = buckets.get(key)
+            if bucket is None:
+                continue
+            if isinstance(bucket, str):
+                if bucket == spelling:
+                    del buckets[key]
+                continue
+            bucket.discard(spelling)
+            if len(bucket) == 1:
+                buckets[key] = next(iter(bucket))
+
+    def candidates(self, query: str) -> Set[str]:
+        """与query共享任一桶键的拼写（需要candidate_keys）"""
+        if not self.candidate_keys:
+            raise ValueError("索引未保存候选键")
+        return self._lookup(phonetic_keys(query))
+
+    def equivalents(self, query: str) -> Set[str]:
+        """与query折叠形式或读音键相同的拼写（candidates的子集）"""
+        folded: str = fold(query)
+        return self._lookup(_exact_keys(folded, _letters(folded)))
+
+    def _lookup(self, keys: List[str]) -> Set[str]:
+        result: Set[str] = set()
+        for key in keys:
+            bucket: Union[str, Set[str], None] = self._buckets.get(key)
+            if isinstance(bucket, str):
+                result.add(bucket)
+            elif bucket is not None:
+                result.update(bucket)
+        return result
@@ -0,0 +1,166 @@
+"""操作耗时统计
+为WordManager的公共方法和algo的入口函数记录调用次数、累计耗时和延迟分位数，
+以及每次搜索打分的候选数等数值指标。默认关闭，关闭时每次调用只多一次布尔判断
+
+另提供cProfile采集：对单次操作做函数级剖析
+"""
+import functools
+import json
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+from settings import PROFILING_ENABLED, PROFILING_SAMPLE_SIZE
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+
+class MetricStats:
+    """一项指标的统计：次数和总和精确累计，分位数基于最近的若干个样本"""
+
+    def __init__(self, sample_size: int) -> None:
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+        self.samples: Deque[float] = deque(maxlen=max(1, sample_size))
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        self.samples.append(value)
+
+    def percentile(self, percent: float, ordered: Optional[List[float]] = None) -> float:
+        """最近样本的百分位数（最近秩法）"""
+        ordered = ordered if ordered is not None else sorted(self.samples)
+        if not ordered:
+            return 0.0
+        return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+    def summary(self) -> Dict[str, float]:
+        ordered: List[float] = sorted(self.samples)
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(50, ordered),
+            'p95': self.percentile(95, ordered),
+            'p99': self.percentile(99, ordered),
+            'max': self.max,
+        }
+
+
+class Profiler:
+    """
+    指标收集器
+    timings保存各操作的耗时（秒），values保存其他数值指标（如每次搜索打分的候选数）
+    """
+
+    def __init__(self, enabled: bool = False, sample_size: int = 10000) -> None:
+        self.enabled: bool = enabled
+        self.sample_size: int = sample_size
+        self.timings: Dict[str, MetricStats] = {}
+        self.values: Dict[str, MetricStats] = {}
+
+    def record(self, name: str, elapsed: float) -> None:
+        """记录一次操作的耗时（秒）"""
+        stats: Optional[MetricStats] = self.timings.get(name)
+        if stats is None:
+            stats = self.timings[name] = MetricStats(self.sample_size)
+        stats.add(elapsed)
+
+    def observe(self, name: str, value: float) -> None:
+        """记录一个数值指标，关闭时忽略"""
+        if not self.enabled:
+            return
+        stats: Optional[MetricStats] = self.values.get(name)
+        if stats is None:
+            stats = self.values[name] = MetricStats(self.sample_size)
+        stats.add(value)
+
+    def reset(self) -> None:
+        """清空已收集的统计"""
+        self.timings = {}
+        self.values = {}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """返回可序列化为JSON的统计结果，耗时单位为秒"""
+        return {
+            'enabled': self.enabled,
+            'timings': {name: stats.summary() for name, stats in sorted(self.timings.items())},
+            'values': {name: stats.summary() for name, stats in sorted(self.values.items())},
+        }
+
+    def dump(self, path: str) -> None:
+        """将统计结果写入JSON文件"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+    def format_table(self) -> str:
+        """以表格形式返回统计结果，耗时单位为毫秒"""
+        lines: List[str] = [f"{'操作':<36}{'次数':>8}{'累计ms':>12}{'p50':>10}{'p95':>10}{'p99':>10}{'最大':>10}"]
+        for name, stats in sorted(self.timings.items(), key=lambda item: -item[1].total):
+            s: Dict[str, float] = stats.summary()
+            lines.append(f"{name:<38}{s['count']:>10}{s['total'] * 1000:>14.2f}{s['p50'] * 1000:>12.3f}"
+                         f"{s['p95'] * 1000:>12.3f}{s['p99'] * 1000:>12.3f}{s['max'] * 1000:>12.3f}")
+        if self.values:
+            lines.append(f"{'指标':<36}{'次数':>8}{'平均':>12}{'p50':>10}{'p95':>10}{'p99':>10}{'最大':>10}")
+            for name, stats in sorted(self.values.items()):
+                s = stats.summary()
+                lines.append(f"{name:<38}{s['count']:>10}{s['mean']:>14.1f}{s['p50']:>12.0f}"
+                             f"{s['p95']:>12.0f}{s['p99']:>12.0f}{s['max']:>12.0f}")
+        return '\n'.join(lines)
+
+
+# 全局收集器，初始状态由配置决定，运行时可随时开关
+profiler = Profiler(PROFILING_ENABLED, PROFILING_SAMPLE_SIZE)
+
+
+def instrument(name: str) -> Callable[[F], F]:
+    """
+    记录被装饰函数每次调用耗时的装饰器，统计关闭时直接调用原函数
+
+    参数:
+        name: 指标名，如'WordManager.search_words'
+    """
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            start: float = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def profile_call(func: Callable[[], Any], path: Optional[str] = None, limit: int = 25) -> Tuple[Any, str]:
+    """
+    在cProfile下执行一次func
+
+    参数:
+        func: 要剖析的操作
+        path: 保存原始剖析数据的文件（可用pstats或snakeviz查看），默认不保存
+        limit: 报告中列出的函数数
+
+    返回:
+        (func的返回值, 按累计耗时排序的报告)
+    """
+    # 只在需要剖析时才导入，不增加程序启动耗时
+    import cProfile
+    import io
+    import pstats
+
+    profile = cProfile.Profile()
+    try:
+        result: Any = profile.runcall(func)
+    finally:
+        if path:
+            profile.dump_stats(path)
+    output = io.StringIO()
+    pstats.Stats(profile, stream=output).strip_dirs().sort_stats('cumulative').print_stats(limit)
+    return result, output.getvalue()
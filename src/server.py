@@ -0,0 +1,414 @@
+"""本地查询服务
+基于asyncio的HTTP/JSON服务，多个客户端共用一个预先加载的WordManager：
+查询在工作线程中执行（读写锁保证并发读互不阻塞、写操作独占），事件循环只负责收发请求，
+模糊打分等耗时计算不会阻塞其他连接；每类请求的延迟分位数可通过 /metrics 查看
+
+接口（响应均为JSON对象，含ok字段，失败时含error字段）：
+  GET    /search?q=KEYWORD&limit=10          模糊搜索单词
+  GET    /text?q=QUERY&limit=10              在释义和例句中全文查询
+  GET    /complete?prefix=PREFIX&limit=10&offset=0   前缀查询
+  GET    /words/SPELLING                     单词详情（拼写不存在时忽略大小写查找）
+  POST   /words                              添加单词（及释义、例句），请求体为JSON：
+                                             {"spelling", "pos", "meaning", "original_sentence", "translated_meaning"}
+  DELETE /words/SPELLING                     删除单词
+  POST   /save                               保存修改
+  GET    /stats                              词库统计
+  GET    /metrics                            请求延迟统计
+
+启动：python src/main.py serve [--host HOST] [--port PORT] [--workers N]
+"""
+import asyncio
+import json
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+from logic import WordManager
+from word import Word
+from importer import ImportReport
+from profiling import Profiler
+from settings import SERVER_HOST, SERVER_PORT, SERVER_WORKERS
+
+# 请求体的最大字节数
+MAX_BODY_SIZE = 1024 * 1024
+# 请求头的最大行数
+MAX_HEADERS = 100
+# 查询参数limit的默认值
+DEFAULT_LIMIT = 10
+
+# 路由的执行方式：在工作线程中持读锁 / 持写锁执行，或直接在事件循环中执行（不访问词库）
+READ, WRITE, INLINE = 'read', 'write', 'inline'
+
+Response = Tuple[int, Dict[str, Any]]
+
+
+class HttpError(Exception):
+    """以指定状态码结束请求"""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status: int = status
+
+
+class ReadWriteLock:
+    """
+    读写锁：多个读者可同时持有，写者独占
+    有写者等待时新来的读者排在其后，持续的查询不会使修改操作饿死
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._readers: int = 0
+        self._writing: bool = False
+        self._waiting_writers: int = 0
+
+    @contextmanager
+    def reading(self) -> Iterator[None]:
+        with self._condition:
+            while self._writing or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def writing(self) -> Iterator[None]:
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class Request:
+    """解析后的HTTP请求"""
+
+    def __init__(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> None:
+        self.method: str = method
+        parts = urlsplit(target)
+        self.path: str = parts.path
+        self.query: Dict[str, List[str]] = parse_qs(parts.query)
+        self.headers: Dict[str, str] = headers
+        self.body: bytes = body
+
+    def param(self, name: str, default: Optional[str] = None) -> str:
+        values: Optional[List[str]] = self.query.get(name)
+        if values:
+            return values[0]
+        if default is None:
+            raise HttpError(400, f"缺少参数 {name}")
+        return default
+
+    def int_param(self, name: str, default: int) -> int:
+        value: str = self.param(name, str(default))
+        try:
+            return int(value)
+        except ValueError:
+            raise HttpError(400, f"参数 {name} 应为整数: {value}")
+
+    def json(self) -> Dict[str, Any]:
+        try:
+            data: Any = json.loads(self.body.decode('utf-8'))
+        except (UnicodeDecodeError, ValueError) as e:
+            raise HttpError(400, f"请求体不是有效的JSON: {str(e)}")
+        if not isinstance(data, dict):
+            raise HttpError(400, "请求体应为JSON对象")
+        return data
+
+
+class QueryServer:
+    """
+    查询服务
+    每个请求的处理函数在线程池中执行并持有读锁或写锁，请求耗时按路由记录在metrics中
+    """
+
+    def __init__(self, manager: WordManager, workers: int = SERVER_WORKERS) -> None:
+        self.manager: WordManager = manager
+        self.lock = ReadWriteLock()
+        # 请求延迟统计（按 方法+路由 分类），始终开启，与全局的操作耗时统计互不影响
+        self.metrics = Profiler(enabled=True)
+        # 各状态码的响应数
+        self.status_counts: Dict[int, int] = {}
+        # 上次保存以来是否有修改
+        self.modified: bool = False
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='query')
+        self._server: Optional[asyncio.AbstractServer] = None
+        # 当前打开的连接，停止服务时关闭空闲的keep-alive连接
+        self._connections: Set[asyncio.StreamWriter] = set()
+        # (方法, 路径或以/结尾的路径前缀) -> (处理函数, 执行方式)
+        self._routes: Dict[Tuple[str, str], Tuple[Callable[[Request], Response], str]] = {
+            ('GET', '/search'): (self._search, READ),
+            ('GET', '/text'): (self._search_text, READ),
+            ('GET', '/complete'): (self._complete, READ),
+            ('GET', '/words/'): (self._show, READ),
+            ('POST', '/words'): (self._add, WRITE),
+            ('DELETE', '/words/'): (self._delete, WRITE),
+            ('POST', '/save'): (self._save, WRITE),
+            ('GET', '/stats'): (self._stats, READ),
+            ('GET', '/metrics'): (self._metrics, INLINE),
+        }
+
+    async def start(self, host: str = SERVER_HOST, port: int = SERVER_PORT) -> int:
+        """开始监听，返回实际端口（port为0时由系统分配）"""
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        """停止监听并等待正在执行的请求结束"""
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # 一个连接上可依次处理多个请求（HTTP/1.1 keep-alive）
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    request: Optional[Request] = await self._read_request(reader)
+                except HttpError as e:
+                    await self._write_response(writer, e.status, {'ok': False, 'error': str(e)}, True)
+                    break
+                if request is None:
+                    break
+                started: float = time.perf_counter()
+                route, status, payload = await self._dispatch(request)
+                close: bool = request.headers.get('connection', '').lower() == 'close'
+                await self._write_response(writer, status, payload, close)
+                self.metrics.record(f"{request.method} {route}", time.perf_counter() - started)
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Request]:
+        # 读取一个请求，连接已关闭时返回None
+        try:
+            line: bytes = await reader.readline()
+        except ValueError:
+            raise HttpError(400, "请求行过长")
+        if not line:
+            return None
+        parts: List[str] = line.decode('latin-1').split()
+        if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+            raise HttpError(400, "无效的请求行")
+        method, target, version = parts
+
+        headers: Dict[str, str] = {}
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                raise HttpError(400, "请求头过长")
+            if line in (b'\r\n', b'\n', b''):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise HttpError(400, "请求头过多")
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if version == 'HTTP/1.0' and headers.get('connection', '').lower() != 'keep-alive':
+            headers['connection'] = 'close'
+
+        try:
+            length: int = int(headers.get('content-length', '0'))
+        except ValueError:
+            raise HttpError(400, "无效的Content-Length")
+        if length < 0:
+            raise HttpError(400, "无效的Content-Length")
+        if length > MAX_BODY_SIZE:
+            raise HttpError(413, "请求体过大")
+        body: bytes = await reader.readexactly(length) if length else b''
+        return Request(method.upper(), target, headers, body)
+
+    async def _dispatch(self, request: Request) -> Tuple[str, int, Dict[str, Any]]:
+        # 返回 (路由名, 状态码, 响应内容)
+        route: Optional[Tuple[str, str]] = self._match(request)
+        if route is None:
+            methods: List[str] = [method for method, path in self._routes if self._matches(path, request.path)]
+            if methods:
+                return 'unmatched', 405, {'ok': False, 'error': f"不支持的方法 {request.method}"}
+            return 'unmatched', 404, {'ok': False, 'error': f"未知的路径 {request.path}"}
+
+        handler, mode = self._routes[route]
+        name: str = route[1] + '{spelling}' if route[1].endswith('/') else route[1]
+        try:
+            if mode == INLINE:
+                status, payload = handler(request)
+            else:
+                loop = asyncio.get_running_loop()
+                status, payload = await loop.run_in_executor(self._executor, self._locked, mode, handler, request)
+        except HttpError as e:
+            status, payload = e.status, {'error': str(e)}
+        except Exception as e:
+            print(f"处理请求 {request.method} {request.path} 失败: {str(e)}", file=sys.stderr)
+            status, payload = 500, {'error': str(e)}
+        return name, status, dict(ok=status < 400, **payload)
+
+    def _match(self, request: Request) -> Optional[Tuple[str, str]]:
+        for method, path in self._routes:
+            if method == request.method and self._matches(path, request.path):
+                return method, path
+        return None
+
+    @staticmethod
+    def _matches(route: str, path: str) -> bool:
+        # 以/结尾的路由匹配其下一级路径（如/words/apple），其余完全匹配
+        if route.endswith('/'):
+            return path.startswith(route) and len(path) > len(route)
+        return path == route
+
+    def _locked(self, mode: str, handler: Callable[[Request], Response], request: Request) -> Response:
+        # 在工作线程中持锁执行处理函数
+        if mode == WRITE:
+            with self.lock.writing():
+                return handler(request)
+        with self.lock.reading():
+            return handler(request)
+
+    async def _write_response(self, writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any],
+                              close: bool) -> None:
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        body: bytes = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head: str = (f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                     "Content-Type: application/json; charset=utf-8\r\n"
+                     f"Content-Length: {len(body)}\r\n"
+                     + ("Connection: close\r\n" if close else "") + "\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    @staticmethod
+    def _limit(request: Request) -> Optional[int]:
+        # limit为0表示全部
+        limit: int = request.int_param('limit', DEFAULT_LIMIT)
+        return limit if limit > 0 else None
+
+    @staticmethod
+    def _spelling(request: Request) -> str:
+        return unquote(request.path.split('/', 2)[2])
+
+    def _search(self, request: Request) -> Response:
+        keyword: str = request.param('q')
+        results: List[Word] = self.manager.search_words(keyword, self._limit(request))
+        return 200, {'keyword': keyword, 'total': self.manager.count_search_results(keyword),
+                     'results': [word.spelling for word in results]}
+
+    def _search_text(self, request: Request) -> Response:
+        query: str = request.param('q')
+        results: List[Word] = self.manager.search_text(query, self._limit(request))
+        return 200, {'query': query, 'results': [word.spelling for word in results]}
+
+    def _complete(self, request: Request) -> Response:
+        prefix: str = request.param('prefix')
+        limit: int = request.int_param('limit', DEFAULT_LIMIT)
+        offset: int = request.int_param('offset', 0)
+        results: List[Word] = self.manager.complete(prefix, limit, offset)
+        return 200, {'prefix': prefix, 'total': self.manager.count_prefix(prefix),
+                     'results': [word.spelling for word in results]}
+
+    def _show(self, request: Request) -> Response:
+        spelling: str = self._spelling(request)
+        word: Optional[Word] = self.manager.get_word(spelling)
+        words: List[Word] = [word] if word is not None else self.manager.get_words_ignore_case(spelling)
+        if not words:
+            raise HttpError(404, f"单词 '{spelling}' 不存在")
+        return 200, {'words': [word.to_dict() for word in words]}
+
+    def _check_writable(self) -> None:
+        if self.manager.is_read_only():
+            raise HttpError(409, "词库以只读快照方式打开，无法修改")
+
+    def _add(self, request: Request) -> Response:
+        self._check_writable()
+        data: Dict[str, Any] = request.json()
+        record: Dict[str, Any] = {field: data.get(field, '') for field in
+                                  ('spelling', 'pos', 'meaning', 'original_sentence', 'translated_meaning')}
+        report: ImportReport = self.manager.bulk_import([record])
+        if report.rejected:
+            raise HttpError(400, report.rejected[0][1])
+        if report.words_added or report.definitions_added or report.examples_added:
+            self.modified = True
+        return 200, {'spelling': str(record['spelling']).strip(), 'words_added': report.words_added,
+                     'definitions_added': report.definitions_added, 'examples_added': report.examples_added}
+
+    def _delete(self, request: Request) -> Response:
+        self._check_writable()
+        spelling: str = self._spelling(request)
+        word: Optional[Word] = self.manager.get_word(spelling)
+        if word is None or not self.manager.del_word(word):
+            raise HttpError(404, f"单词 '{spelling}' 不存在")
+        self.modified = True
+        return 200, {'deleted': word.spelling}
+
+    def _save(self, request: Request) -> Response:
+        if not self.manager.save_words():
+            raise HttpError(500, "保存失败")
+        self.modified = False
+        return 200, {}
+
+    def _stats(self, request: Request) -> Response:
+        words: List[Word] = self.manager.words
+        return 200, {'words': len(words),
+                     'definitions': sum(len(word.definitions) for word in words),
+                     'examples': sum(len(d.examples) for word in words for d in word.definitions),
+                     'read_only': self.manager.is_read_only(),
+                     'search_cache': self.manager.search_cache_info()}
+
+    def _metrics(self, request: Request) -> Response:
+        # 耗时单位为秒
+        return 200, {'requests': self.metrics.snapshot()['timings'],
+                     'statuses': {str(status): count for status, count in sorted(self.status_counts.items())}}
+
+
+def serve(manager: WordManager, host: str = SERVER_HOST, port: int = SERVER_PORT,
+          workers: int = SERVER_WORKERS) -> bool:
+    """
+    启动查询服务，直到按下Ctrl+C或收到SIGTERM
+
+    返回:
+        上次保存以来词库是否有修改（由调用方决定是否保存）；无法监听时抛出OSError
+    """
+    server = QueryServer(manager, workers)
+
+    async def run() -> None:
+        loop = asyncio.get_running_loop()
+        stopped: asyncio.Future = loop.create_future()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, stopped.set_result, None)
+        except (NotImplementedError, AttributeError):
+            # Windows的事件循环不支持信号处理
+            pass
+        try:
+            bound: int = await server.start(host, port)
+            print(f"查询服务已启动: http://{host}:{bound}/ （Ctrl+C停止）", flush=True)
+            await stopped
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return server.modified
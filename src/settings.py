@@ -1,28 +1,54 @@
 import json
 import os
-from typing import List
+import sys
+from typing import Any, Dict, List
 
-# 加载配置文件
+# 配置文件缺失、无法解析或版本不受支持时使用默认配置，只打印警告，不阻止程序启动
+settings: Dict[str, Any] = {}
 try:
     with open(os.path.join(os.path.dirname(__file__), 'settings.json'), 'r', encoding='utf-8') as f:
         settings = json.load(f)
+    if not isinstance(settings, dict):
+        raise ValueError("top level must be an object")
 except FileNotFoundError:
-    raise Exception("settings.json file not found in src directory")
-except json.JSONDecodeError as e:
-    raise Exception(f"Error parsing settings.json: {e}")
+    print("警告: 未找到src目录下的settings.json，使用默认配置", file=sys.stderr)
+    settings = {}
+except (OSError, ValueError) as e:
+    print(f"警告: 无法解析settings.json（{e}），使用默认配置", file=sys.stderr)
+    settings = {}
 
 # 获取配置版本号，默认为1.0.0
 config_version = settings.get('version', '1.0.0')
 
-# 根据版本号解析配置
-if config_version == '1.0.0':
-    # 1.0.0版本的解析逻辑
-    PAGE_SIZE: int = settings['pagination']['page_size']
-    INITIAL_PAGE: int = settings['pagination']['initial_page']
-    WORDS_PATH: str = settings['words_path']
-    SEARCH_SIMILARITY: float = settings['search_similarity']
-else:
-    raise Exception(f"Unsupported configuration version: {config_version}")
+if config_version != '1.0.0':
+    print(f"警告: 不支持的配置版本 {config_version}，使用默认配置", file=sys.stderr)
+    settings = {}
+
+
+def _section(name: str) -> Dict[str, Any]:
+    # 读取配置中的一节，缺失或类型不对时视为空
+    value: Any = settings.get(name, {})
+    return value if isinstance(value, dict) else {}
+
+
+# 1.0.0版本的解析逻辑，每项缺失时使用默认值
+PAGE_SIZE: int = _section('pagination').get('page_size', 10)
+INITIAL_PAGE: int = _section('pagination').get('initial_page', 1)
+WORDS_PATH: str = settings.get('words_path', './src/words.json')
+SEARCH_SIMILARITY: float = settings.get('search_similarity', 0.75)
+SEARCH_CACHE_SIZE: int = settings.get('search_cache_size', 128)
+PHONETIC_SEARCH_ENABLED: bool = _section('phonetic_search').get('enabled', True)
+PHONETIC_EXHAUSTIVE: bool = _section('phonetic_search').get('exhaustive', True)
+JOURNAL_COMPACT_THRESHOLD: int = settings.get('journal_compact_threshold', 1000)
+PARALLEL_SEARCH_ENABLED: bool = _section('parallel_search').get('enabled', False)
+PARALLEL_SEARCH_WORKERS: int = _section('parallel_search').get('workers', 0)
+PARALLEL_SEARCH_MIN_WORDS: int = _section('parallel_search').get('min_words', 100000)
+PROFILING_ENABLED: bool = _section('profiling').get('enabled', False)
+PROFILING_SAMPLE_SIZE: int = _section('profiling').get('sample_size', 10000)
+BACKGROUND_LOADING: bool = settings.get('background_loading', True)
+SERVER_HOST: str = _section('server').get('host', '127.0.0.1')
+SERVER_PORT: int = _section('server').get('port', 8765)
+SERVER_WORKERS: int = _section('server').get('workers', 4)
 
 # 数据格式版本号，用于文件兼容性检查
-DATA_FORMAT_VERSION: str = "1.0.0"
\ No newline at end of file
+DATA_FORMAT_VERSION: str = "1.0.0"
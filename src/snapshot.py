@@ -0,0 +1,353 @@
+"""只读二进制快照
+将词库编译为可直接内存映射（mmap）的二进制文件，供多个只读查询进程共享：
+打开快照只需读取文件头，不解析、不构建对象图，各进程共用操作系统页缓存中的同一份数据
+
+文件布局（小端序）：
+  文件头       魔数、格式版本、各表的条目数与起始偏移
+  单词表       按拼写排序，每项为 (拼写偏移, 拼写长度, 首条释义序号, 释义数)
+  忽略大小写表 按 (casefold后的拼写, 拼写) 排序，每项为 (折叠拼写偏移, 长度, 单词序号)
+  释义表       每项为 (词性偏移, 长度, 释义偏移, 长度, 首条例句序号, 例句数)
+  例句表       每项为 (原句偏移, 长度, 译句偏移, 长度)
+  字符串区     UTF-8编码的全部字符串，相同的字符串只保存一次
+
+UTF-8字节序与码点序一致，因此按字节比较即可在单词表中二分查找；
+字符串只在被访问时才从映射区解码，单词对象在查找命中时才构建
+
+编译：按扩展名导出即可，如 python src/main.py export words.snap
+"""
+import mmap
+import os
+import struct
+import tempfile
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+from word import Word, Definition, Example, hold_parent
+from journal import _snapshot_mode
+
+SNAPSHOT_EXTENSIONS = ('.snap',)
+
+_MAGIC = b'PEWSNAP\0'
+_FORMAT_VERSION = 1
+
+# 魔数、格式版本、单词数、释义数、例句数，以及单词表、忽略大小写表、释义表、例句表、字符串区的起始偏移
+_HEADER = struct.Struct('<8sIIII5Q')
+_WORD = struct.Struct('<IIII')
+_FOLDED = struct.Struct('<III')
+_DEFINITION = struct.Struct('<IIIIII')
+_EXAMPLE = struct.Struct('<IIII')
+
+# 表项中的偏移和长度为32位无符号整数
+_MAX_OFFSET = 0xFFFFFFFF
+
+
+def is_snapshot_path(path: str) -> bool:
+    """按扩展名判断是否为二进制快照文件"""
+    return path.lower().endswith(SNAPSHOT_EXTENSIONS)
+
+
+class _StringPool:
+    # 编译时的字符串区：相同字符串只写入一次，返回 (偏移, 字节长度)
+
+    def __init__(self) -> None:
+        self.data: bytearray = bytearray()
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+
+    def add(self, text: str) -> Tuple[int, int]:
+        location: Optional[Tuple[int, int]] = self._offsets.get(text)
+        if location is None:
+            encoded: bytes = text.encode('utf-8')
+            if len(self.data) + len(encoded) > _MAX_OFFSET:
+                raise ValueError("快照的字符串区超过4GiB")
+            location = self._offsets[text] = (len(self.data), len(encoded))
+            self.data += encoded
+        return location
+
+
+def write_snapshot(path: str, words: Iterable[Word]) -> None:
+    """
+    将单词编译为二进制快照，重复的拼写只保留第一次出现的单词
+    先写入同目录下的临时文件，同步后原子替换，正在映射旧快照的进程不受影响
+
+    参数:
+        path: 快照文件路径
+        words: 单词
+    """
+    unique: Dict[str, Word] = {}
+    for word in words:
+        unique.setdefault(word.spelling, word)
+    ordered: List[Word] = [unique[spelling] for spelling in sorted(unique)]
+
+    strings = _StringPool()
+    word_table = bytearray()
+    definition_table = bytearray()
+    example_table = bytearray()
+    definition_count: int = 0
+    example_count: int = 0
+    for word in ordered:
+        word_table += _WORD.pack(*strings.add(word.spelling), definition_count, len(word.definitions))
+        for definition in word.definitions:
+            definition_table += _DEFINITION.pack(*strings.add(definition.pos), *strings.add(definition.meaning),
+                                                 example_count, len(definition.examples))
+            for example in definition.examples:
+                example_table += _EXAMPLE.pack(*strings.add(example.original_sentence),
+                                               *strings.add(example.translated_meaning))
+            example_count += len(definition.examples)
+        definition_count += len(word.definitions)
+
+    folded_order: List[Tuple[str, str, int]] = sorted(
+        (word.spelling.casefold(), word.spelling, index) for index, word in enumerate(ordered))
+    folded_table = bytearray()
+    for folded, _, index in folded_order:
+        folded_table += _FOLDED.pack(*strings.add(folded), index)
+
+    words_offset: int = _HEADER.size
+    folded_offset: int = words_offset + len(word_table)
+    definitions_offset: int = folded_offset + len(folded_table)
+    examples_offset: int = definitions_offset + len(definition_table)
+    strings_offset: int = examples_offset + len(example_table)
+    header: bytes = _HEADER.pack(_MAGIC, _FORMAT_VERSION, len(ordered), definition_count, example_count,
+                                 words_offset, folded_offset, definitions_offset, examples_offset, strings_offset)
+
+    directory: str = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.words-', suffix='.tmp')
+    try:
+        os.chmod(temp_path, _snapshot_mode(path))
+        with os.fdopen(fd, 'wb') as f:
+            for block in (header, word_table, folded_table, definition_table, example_table, strings.data):
+                f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class Snapshot:
+    """
+    以只读方式内存映射的二进制快照
+    单词按序号（即拼写的字典序）访问，打开的耗时与词库规模无关
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        with open(path, 'rb') as f:
+            # 空文件无法映射，交给下面的文件头检查报错
+            size: int = os.fstat(f.fileno()).st_size
+            self._map: Optional[mmap.mmap] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        if size < _HEADER.size:
+            self.close()
+            raise ValueError(f"{path} 不是有效的单词快照")
+        (magic, version, self.word_count, self.definition_count, self.example_count, self._words_offset,
+         self._folded_offset, self._definitions_offset, self._examples_offset,
+         self._strings_offset) = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError(f"{path} 不是有效的单词快照")
+        if version != _FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"不支持的快照格式版本 {version}")
+
+    def __len__(self) -> int:
+        return self.word_count
+
+    def close(self) -> None:
+        """解除映射；之后不能再访问快照，已构建的单词对象不受影响"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def _bytes(self, offset: int, length: int) -> bytes:
+        start: int = self._strings_offset + offset
+        return self._map[start:start + length]
+
+    def _string(self, offset: int, length: int) -> str:
+        return str(self._bytes(offset, length), 'utf-8')
+
+    def spelling(self, index: int) -> str:
+        """第index个单词（按拼写排序）的拼写"""
+        offset, length, _, _ = _WORD.unpack_from(self._map, self._words_offset + index * _WORD.size)
+        return self._string(offset, length)
+
+    def word(self, index: int) -> Word:
+        """构建第index个单词及其释义、例句"""
+        offset, length, first_definition, definition_count = _WORD.unpack_from(
+            self._map, self._words_offset + index * _WORD.size)
+        word = Word(self._string(offset, length))
+        for d in range(first_definition, first_definition + definition_count):
+            pos_offset, pos_length, meaning_offset, meaning_length, first_example, example_count = \
+                _DEFINITION.unpack_from(self._map, self._definitions_offset + d * _DEFINITION.size)
+            definition = Definition(word, self._string(pos_offset, pos_length),
+                                    self._string(meaning_offset, meaning_length))
+            for e in range(first_example, first_example + example_count):
+                original_offset, original_length, translated_offset, translated_length = \
+                    _EXAMPLE.unpack_from(self._map, self._examples_offset + e * _EXAMPLE.size)
+                definition.examples.append(Example(word, self._string(original_offset, original_length),
+                                                   self._string(translated_offset, translated_length)))
+            word.definitions.append(definition)
+        # 快照中的单词每次访问都重新构建，释义、例句需要强引用所属单词
+        return hold_parent(word)
+
+    def _spelling_bytes(self, index: int) -> bytes:
+        offset, length, _, _ = _WORD.unpack_from(self._map, self._words_offset + index * _WORD.size)
+        return self._bytes(offset, length)
+
+    def _folded_entry(self, position: int) -> Tuple[bytes, int]:
+        offset, length, index = _FOLDED.unpack_from(self._map, self._folded_offset + position * _FOLDED.size)
+        return self._bytes(offset, length), index
+
+    def _lower_bound(self, key: bytes, read: Callable[[int], bytes]) -> int:
+        # 在按字节序排列的表中二分查找第一个不小于key的位置
+        low, high = 0, self.word_count
+        while low < high:
+            middle: int = (low + high) // 2
+            if read(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def bisect(self, spelling: str) -> int:
+        """第一个拼写不小于spelling的单词序号"""
+        return self._lower_bound(spelling.encode('utf-8'), self._spelling_bytes)
+
+    def find(self, spelling: str) -> int:
+        """拼写为spelling的单词序号，不存在时返回-1"""
+        key: bytes = spelling.encode('utf-8')
+        index: int = self._lower_bound(key, self._spelling_bytes)
+        if index < self.word_count and self._spelling_bytes(index) == key:
+            return index
+        return -1
+
+    def find_folded(self, folded: str) -> List[int]:
+        """casefold后的拼写等于folded的全部单词序号（按拼写排序）"""
+        key: bytes = folded.encode('utf-8')
+        position: int = self._lower_bound(key, lambda p: self._folded_entry(p)[0])
+        indices: List[int] = []
+        while position < self.word_count:
+            entry_key, index = self._folded_entry(position)
+            if entry_key != key:
+                break
+            indices.append(index)
+            position += 1
+        return indices
+
+    def _table(self, offset: int, entry: struct.Struct) -> Iterator[tuple]:
+        # 顺序解码一整张表（每项一个元组），比逐项unpack_from快得多；
+        # 读出表的副本而不是持有映射区的memoryview，以免遍历未结束时无法解除映射
+        return entry.iter_unpack(self._map[offset:offset + self.word_count * entry.size])
+
+    def iter_spellings(self) -> Iterator[str]:
+        """按字典序依次返回全部拼写"""
+        for offset, length, _, _ in self._table(self._words_offset, _WORD):
+            yield self._string(offset, length)
+
+    def iter_folded(self) -> Iterator[Tuple[str, List[int]]]:
+        """按casefold后的拼写分组，依次返回 (折叠拼写, 单词序号列表)"""
+        key: Optional[Tuple[int, int]] = None
+        indices: List[int] = []
+        for offset, length, index in self._table(self._folded_offset, _FOLDED):
+            # 相同的字符串在字符串区只保存一次，折叠拼写相同即偏移相同
+            if (offset, length) != key:
+                if key is not None:
+                    yield self._string(*key), indices
+                key, indices = (offset, length), []
+            indices.append(index)
+        if key is not None:
+            yield self._string(*key), indices
+
+
+class SnapshotSpellings(Sequence):
+    """快照中按字典序排列的拼写，可直接用bisect查找和切片"""
+
+    def __init__(self, snapshot: Snapshot) -> None:
+        self._snapshot: Snapshot = snapshot
+
+    def __len__(self) -> int:
+        return len(self._snapshot)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self._snapshot.spelling(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._snapshot.spelling(index)
+
+
+class SnapshotWords(Mapping):
+    """拼写 -> 单词 的只读映射，按拼写二分查找，单词对象在访问时构建"""
+
+    def __init__(self, snapshot: Snapshot) -> None:
+        self._snapshot: Snapshot = snapshot
+
+    def __len__(self) -> int:
+        return len(self._snapshot)
+
+    def __iter__(self) -> Iterator[str]:
+        return self._snapshot.iter_spellings()
+
+    def __contains__(self, spelling: object) -> bool:
+        return isinstance(spelling, str) and self._snapshot.find(spelling) >= 0
+
+    def __getitem__(self, spelling: str) -> Word:
+        index: int = self._snapshot.find(spelling) if isinstance(spelling, str) else -1
+        if index < 0:
+            raise KeyError(spelling)
+        return self._snapshot.word(index)
+
+    def values(self) -> Iterator[Word]:
+        # 按序号顺序构建，无需逐个二分查找
+        return (self._snapshot.word(i) for i in range(len(self._snapshot)))
+
+
+class _SnapshotBucket(Mapping):
+    # 拼写忽略大小写后相同的一组单词：拼写 -> 单词，遍历拼写时不构建单词对象
+
+    def __init__(self, snapshot: Snapshot, indices: List[int]) -> None:
+        self._snapshot: Snapshot = snapshot
+        self._indices: List[int] = indices
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._snapshot.spelling(i) for i in self._indices)
+
+    def __getitem__(self, spelling: str) -> Word:
+        for i in self._indices:
+            if self._snapshot.spelling(i) == spelling:
+                return self._snapshot.word(i)
+        raise KeyError(spelling)
+
+    def values(self) -> Iterator[Word]:
+        return (self._snapshot.word(i) for i in self._indices)
+
+
+class SnapshotFoldedWords(Mapping):
+    """casefold后的拼写 -> {拼写: 单词} 的只读映射，对应WordManager._folded_words"""
+
+    def __init__(self, snapshot: Snapshot) -> None:
+        self._snapshot: Snapshot = snapshot
+
+    def __len__(self) -> int:
+        # 分组数需要遍历整张表，WordManager不使用
+        return sum(1 for _ in self._snapshot.iter_folded())
+
+    def __iter__(self) -> Iterator[str]:
+        return (folded for folded, _ in self._snapshot.iter_folded())
+
+    def __contains__(self, folded: object) -> bool:
+        return isinstance(folded, str) and bool(self._snapshot.find_folded(folded))
+
+    def __getitem__(self, folded: str) -> _SnapshotBucket:
+        indices: List[int] = self._snapshot.find_folded(folded) if isinstance(folded, str) else []
+        if not indices:
+            raise KeyError(folded)
+        return _SnapshotBucket(self._snapshot, indices)
+
+    def items(self) -> Iterator[Tuple[str, _SnapshotBucket]]:
+        # 顺序遍历整张表，无需逐组二分查找
+        return ((folded, _SnapshotBucket(self._snapshot, indices)) for folded, indices in self._snapshot.iter_folded())
+
@@ -0,0 +1,298 @@
+"""单词数据存储后端
+WordManager通过统一的存储接口加载和保存单词，按文件扩展名选择实现：
+  *.db / *.sqlite / *.sqlite3  -> SQLiteStorage
+  *.snap                       -> SnapshotStorage（只读二进制快照，加载时内存映射）
+  其他（*.json / *.jsonl）      -> JsonStorage（快照 + 预写日志）
+"""
+import os
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from word import Word, Definition, Example
+from journal import WordJournal
+from jsonstream import iter_json_array, iter_json_lines
+from snapshot import Snapshot, write_snapshot, is_snapshot_path
+from settings import JOURNAL_COMPACT_THRESHOLD
+
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+# SQLite每批读取的行数
+FETCH_BATCH_SIZE = 1000
+
+
+class WordStorage:
+    """
+    存储后端基类
+    修改操作为包含'op'字段的字典（格式见WordManager._record），由commit按操作增量持久化
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+
+    def exists(self) -> bool:
+        """存储文件是否存在"""
+        return os.path.exists(self.path)
+
+    def iter_words(self) -> Iterator[Word]:
+        """逐个读取已保存的单词"""
+        raise NotImplementedError
+
+    def iter_ops(self) -> Iterator[Dict[str, Any]]:
+        """读取iter_words之后尚需回放的修改操作，默认没有"""
+        return iter(())
+
+    def commit(self, ops: List[Dict[str, Any]], words: Callable[[], Iterable[Word]]) -> None:
+        """
+        持久化上次提交以来的修改操作
+
+        参数:
+            ops: 修改操作列表
+            words: 返回全部单词的函数，后端需要整体重写时调用
+        """
+        raise NotImplementedError
+
+    def write_all(self, words: Iterable[Word]) -> None:
+        """用给定的全部单词整体替换已保存的数据"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """释放后端占用的资源"""
+
+
+class JsonStorage(WordStorage):
+    """
+    JSON文件存储：快照文件（JSON数组或JSON Lines）加预写日志
+    提交时只追加日志，快照不存在或日志过长时压缩为新快照
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self._journal: WordJournal = WordJournal(path)
+        # 日志中已有的操作数
+        self._journal_ops: int = 0
+
+    def iter_words(self) -> Iterator[Word]:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            records = iter_json_lines(f) if self.path.endswith('.jsonl') else iter_json_array(f)
+            for word_data in records:
+                yield Word.from_dict(word_data)
+
+    def iter_ops(self) -> Iterator[Dict[str, Any]]:
+        self._journal_ops = 0
+        for op in self._journal.iter_ops():
+            self._journal_ops += 1
+            yield op
+
+    def commit(self, ops: List[Dict[str, Any]], words: Callable[[], Iterable[Word]]) -> None:
+        if not self._journal.has_snapshot() or self._journal_ops + len(ops) >= JOURNAL_COMPACT_THRESHOLD:
+            self.write_all(words())
+        else:
+            self._journal.append(ops)
+            self._journal_ops += len(ops)
+
+    def write_all(self, words: Iterable[Word]) -> None:
+        self._journal.write_snapshot(words)
+        self._journal_ops = 0
+
+
+class SQLiteStorage(WordStorage):
+    """
+    SQLite存储：单词、释义、例句分表保存，拼写建有索引
+    每次提交在一个事务中按操作逐条更新，无需重写整个数据库
+    加载时仍逐行读出全部单词交给WordManager（搜索和各索引需要完整的单词表），
+    启动耗时和内存占用与JSON格式相同；需要快速启动的大词库应使用SnapshotStorage
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS words (
+            id INTEGER PRIMARY KEY,
+            spelling TEXT NOT NULL UNIQUE
+        );
+        CREATE INDEX IF NOT EXISTS idx_words_spelling_nocase ON words(spelling COLLATE NOCASE);
+        CREATE TABLE IF NOT EXISTS definitions (
+            id INTEGER PRIMARY KEY,
+            word_id INTEGER NOT NULL REFERENCES words(id) ON DELETE CASCADE,
+            pos TEXT NOT NULL,
+            meaning TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_definitions_word ON definitions(word_id, pos, meaning);
+        CREATE TABLE IF NOT EXISTS examples (
+            id INTEGER PRIMARY KEY,
+            definition_id INTEGER NOT NULL REFERENCES definitions(id) ON DELETE CASCADE,
+            original_sentence TEXT NOT NULL,
+            translated_meaning TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_examples_definition
+            ON examples(definition_id, original_sentence, translated_meaning);
+    """
+
+    # 按 (拼写, 词性, 释义) 定位一条释义
+    _DEFINITION_ID = """
+        SELECT definitions.id FROM definitions JOIN words ON definitions.word_id = words.id
+        WHERE words.spelling = ? AND definitions.pos = ? AND definitions.meaning = ?
+        ORDER BY definitions.id LIMIT 1
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self._connection: Optional[sqlite3.Connection] = None
+        # 连接可能被加载线程和其他线程共用，所有访问串行化
+        self._lock = threading.RLock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # 首次使用时打开数据库并建表
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA foreign_keys = ON")
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(self._SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def iter_words(self) -> Iterator[Word]:
+        with self._lock:
+            cursor = self._connect().execute("""
+                SELECT words.id, words.spelling, definitions.id, definitions.pos, definitions.meaning,
+                       examples.original_sentence, examples.translated_meaning
+                FROM words
+                LEFT JOIN definitions ON definitions.word_id = words.id
+                LEFT JOIN examples ON examples.definition_id = definitions.id
+                ORDER BY words.id, definitions.id, examples.id
+            """)
+
+        # 按单词、释义分组还原对象
+        word: Optional[Word] = None
+        definition: Optional[Definition] = None
+        word_id: Optional[int] = None
+        definition_id: Optional[int] = None
+        for row_word_id, spelling, row_definition_id, pos, meaning, original, translated in self._fetch(cursor):
+            if row_word_id != word_id:
+                if word is not None:
+                    yield word
+                word, word_id = Word(spelling), row_word_id
+                definition, definition_id = None, None
+            if row_definition_id is None:
+                continue
+            if row_definition_id != definition_id:
+                definition, definition_id = Definition(word, pos, meaning), row_definition_id
+                word.add_definition(definition)
+            if original is not None:
+                definition.add_example(Example(word, original, translated))
+        if word is not None:
+            yield word
+
+    def _fetch(self, cursor: sqlite3.Cursor) -> Iterator[tuple]:
+        # 分批读取查询结果，避免一次性载入全部行
+        while True:
+            with self._lock:
+                rows: List[tuple] = cursor.fetchmany(FETCH_BATCH_SIZE)
+            if not rows:
+                return
+            yield from rows
+
+    def commit(self, ops: List[Dict[str, Any]], words: Callable[[], Iterable[Word]]) -> None:
+        if not ops:
+            return
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                for op in ops:
+                    self._apply(connection, op)
+
+    def _apply(self, connection: sqlite3.Connection, op: Dict[str, Any]) -> None:
+        # 将一次修改操作写入数据库，目标不存在时忽略
+        kind: str = op.get('op', '')
+        if kind == 'clear_all':
+            connection.execute("DELETE FROM words")
+        elif kind == 'add_word':
+            connection.execute("INSERT OR IGNORE INTO words (spelling) VALUES (?)", (op['spelling'],))
+        elif kind == 'del_word':
+            connection.execute("DELETE FROM words WHERE spelling = ?", (op['spelling'],))
+        elif kind == 'add_definition':
+            connection.execute(
+                "INSERT INTO definitions (word_id, pos, meaning) SELECT id, ?, ? FROM words WHERE spelling = ?",
+                (op['pos'], op['meaning'], op['spelling']))
+        elif kind == 'del_definition':
+            connection.execute(f"DELETE FROM definitions WHERE id = ({self._DEFINITION_ID})",
+                               (op['spelling'], op['pos'], op['meaning']))
+        elif kind == 'modify_definition':
+            connection.execute(f"UPDATE definitions SET pos = ?, meaning = ? WHERE id = ({self._DEFINITION_ID})",
+                               (op['new_pos'], op['new_meaning'], op['spelling'], op['pos'], op['meaning']))
+        elif kind == 'add_example':
+            connection.execute(
+                "INSERT INTO examples (definition_id, original_sentence, translated_meaning) "
+                f"SELECT id, ?, ? FROM ({self._DEFINITION_ID})",
+                (op['original_sentence'], op['translated_meaning'], op['spelling'], op['pos'], op['meaning']))
+        elif kind == 'del_example':
+            connection.execute(
+                "DELETE FROM examples WHERE id = (SELECT id FROM examples WHERE definition_id = "
+                f"({self._DEFINITION_ID}) AND original_sentence = ? AND translated_meaning = ? "
+                "ORDER BY id LIMIT 1)",
+                (op['spelling'], op['pos'], op['meaning'], op['original_sentence'], op['translated_meaning']))
+
+    def write_all(self, words: Iterable[Word]) -> None:
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("DELETE FROM words")
+                for word in words:
+                    word_id: int = connection.execute(
+                        "INSERT INTO words (spelling) VALUES (?)", (word.spelling,)).lastrowid
+                    for definition in word.definitions:
+                        definition_id: int = connection.execute(
+                            "INSERT INTO definitions (word_id, pos, meaning) VALUES (?, ?, ?)",
+                            (word_id, definition.pos, definition.meaning)).lastrowid
+                        connection.executemany(
+                            "INSERT INTO examples (definition_id, original_sentence, translated_meaning) "
+                            "VALUES (?, ?, ?)",
+                            [(definition_id, example.original_sentence, example.translated_meaning)
+                             for example in definition.examples])
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class SnapshotStorage(WordStorage):
+    """
+    二进制快照存储（格式见snapshot.py）
+    WordManager加载时直接内存映射并以只读方式使用，不逐个读取单词；快照不能增量修改，只能整体重新编译
+    """
+
+    def open(self) -> Snapshot:
+        """内存映射快照"""
+        return Snapshot(self.path)
+
+    def iter_words(self) -> Iterator[Word]:
+        snapshot: Snapshot = self.open()
+        try:
+            for index in range(len(snapshot)):
+                yield snapshot.word(index)
+        finally:
+            snapshot.close()
+
+    def commit(self, ops: List[Dict[str, Any]], words: Callable[[], Iterable[Word]]) -> None:
+        if ops:
+            self.write_all(words())
+
+    def write_all(self, words: Iterable[Word]) -> None:
+        write_snapshot(self.path, words)
+
+
+def open_storage(path: str) -> WordStorage:
+    """
+    按文件扩展名创建存储后端
+
+    参数:
+        path: 单词数据文件路径
+
+    返回:
+        对应的存储后端实例
+    """
+    if path.lower().endswith(SQLITE_EXTENSIONS):
+        return SQLiteStorage(path)
+    if is_snapshot_path(path):
+        return SnapshotStorage(path)
+    return JsonStorage(path)
@@ -0,0 +1,157 @@
+"""全文倒排索引
+为释义和例句建立 词项 -> {文档: 加权词频} 的倒排表，支持按相关度排序的反查
+
+分词规则：
+  英文、数字按单词切分并转为小写（casefold）
+  连续的中日韩字符按单字和相邻两字（bigram）切分，
+  如"产生影响"切分为 产 生 影 响 产生 生影 影响，单字与双字查询都能命中
+"""
+import heapq
+import math
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# 中日韩字符：平假名、片假名、CJK统一汉字（含扩展A）、兼容汉字、韩文音节
+_CJK = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af'
+# 连续的中日韩字符，或不含中日韩字符的单词（字母数字，可含词内撇号，如don't）
+_WORD = rf"(?:(?![{_CJK}])[^\W_])+"
+_TOKEN_PATTERN = re.compile(rf"[{_CJK}]+|{_WORD}(?:'{_WORD})*")
+_CJK_PATTERN = re.compile(rf"[{_CJK}]")
+
+# BM25参数：词频饱和度与文档长度归一化程度
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    将文本切分为词项
+
+    参数:
+        text: 文本
+
+    返回:
+        词项列表（按出现顺序，可能重复）
+    """
+    tokens: List[str] = []
+    for match in _TOKEN_PATTERN.finditer(text.casefold()):
+        token: str = match.group()
+        if not _CJK_PATTERN.match(token):
+            tokens.append(token)
+            continue
+        tokens.extend(token)
+        tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+    return tokens
+
+
+class TextIndex:
+    """
+    倒排索引，文档以键（如单词拼写）标识，每个文档由若干带权重的文本字段组成
+    文档内容变化时先删除再重新添加，更新开销只与该文档的文本长度有关
+    索引不保存原文，短语匹配时通过text_of按需取回候选文档的文本
+    """
+
+    def __init__(self, text_of: Optional[Callable[[str], Iterable[str]]] = None) -> None:
+        # 返回文档各字段原文的函数，为None时不区分短语匹配
+        self._text_of = text_of
+        # 词项 -> {文档键: 加权词频}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        # 文档键 -> {词项: 加权词频}，删除文档时据此定位倒排表
+        self._documents: Dict[str, Dict[str, float]] = {}
+        # 文档键 -> 加权长度（词频之和）
+        self._lengths: Dict[str, float] = {}
+        # 全部文档的加权长度之和，用于计算平均文档长度
+        self._total_length: float = 0.0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._documents
+
+    def add(self, key: str, fields: Iterable[Tuple[str, float]]) -> None:
+        """
+        添加（或替换）文档
+
+        参数:
+            key: 文档键
+            fields: (文本, 权重) 列表，如释义权重高于例句
+        """
+        self.remove(key)
+        terms: Dict[str, float] = {}
+        for text, weight in fields:
+            for token in tokenize(text):
+                terms[token] = terms.get(token, 0.0) + weight
+        if not terms:
+            return
+        self._documents[key] = terms
+        self._lengths[key] = sum(terms.values())
+        self._total_length += self._lengths[key]
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[key] = frequency
+
+    def remove(self, key: str) -> bool:
+        """删除文档，不存在时返回False"""
+        terms: Optional[Dict[str, float]] = self._documents.pop(key, None)
+        if terms is None:
+            return False
+        self._total_length -= self._lengths.pop(key)
+        for term in terms:
+            posting: Dict[str, float] = self._postings[term]
+            del posting[key]
+            if not posting:
+                del self._postings[term]
+        return True
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[float, str]]:
+        """
+        查找包含查询中全部词项的文档，按相关度降序排列
+
+        原文中包含完整查询（忽略大小写）的文档排在只是各词项都出现的文档之前，
+        同一类中按BM25得分排序。只遍历最短的倒排表并在其余倒排表中查找，
+        耗时与匹配的倒排项数成正比，与文档总数无关
+
+        参数:
+            query: 查询文本
+            limit: 最多返回的条数，默认全部
+
+        返回:
+            (得分, 文档键) 列表
+        """
+        terms: Set[str] = set(tokenize(query))
+        if not terms or not self._documents:
+            return []
+        postings: List[Dict[str, float]] = []
+        for term in terms:
+            posting: Optional[Dict[str, float]] = self._postings.get(term)
+            if posting is None:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+
+        count: int = len(self._documents)
+        average_length: float = self._total_length / count
+        # 逆文档频率
+        idfs: List[float] = [math.log(1 + (count - len(p) + 0.5) / (len(p) + 0.5)) for p in postings]
+        phrase: str = query.strip().casefold()
+        # 查询本身就是一个词项（如单个英文单词或两个汉字）时，命中的文档必然包含完整查询，无需取回原文
+        check_phrase: bool = self._text_of is not None and phrase not in terms
+
+        results: List[Tuple[bool, float, str]] = []
+        for key in postings[0]:
+            if not all(key in posting for posting in postings[1:]):
+                continue
+            norm: float = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[key] / average_length)
+            score: float = 0.0
+            for posting, idf in zip(postings, idfs):
+                frequency: float = posting[key]
+                score += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+            exact: bool = not check_phrase or any(phrase in text.casefold() for text in self._text_of(key))
+            results.append((exact, score, key))
+
+        order = lambda item: (not item[0], -item[1], item[2])
+        if limit is not None and limit < len(results):
+            results = heapq.nsmallest(limit, results, key=order)
+        else:
+            results.sort(key=order)
+        return [(score, key) for _, score, key in results]
@@ -1,8 +1,9 @@
 import os
 import sys
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
 from logic import WordManager
 from word import Word, Definition
+from profiling import profiler, profile_call
 from settings import PAGE_SIZE, INITIAL_PAGE
 
 class EnglishUI:
@@ -10,6 +11,8 @@ class EnglishUI:
     MENU_OPTIONS_MAIN = [
         "添加新单词",
         "查询单词",
+        "前缀查询",
+        "释义/例句全文查询",
         "列出所有单词",
         "保存单词",
         "退出程序"
@@ -21,6 +24,16 @@ class EnglishUI:
         "删除单词",
         "退出编辑"
     ]
+    # 隐藏的性能统计菜单，不在主菜单中显示，在主菜单输入该键进入
+    PROFILING_MENU_KEY = 'p'
+    MENU_OPTIONS_PROFILING = [
+        "查看耗时统计",
+        "开启/关闭统计",
+        "清空统计",
+        "导出统计到JSON文件",
+        "用cProfile剖析下一条命令",
+        "返回"
+    ]
     MENU_OPTION_EDIT_DEFINITION = [
         "修改词性及释义",
         "增加例句",
@@ -33,17 +46,35 @@ class EnglishUI:
         self.commands: Dict[str, Callable[[], None]] = {
             '1': self.option_add_word,
             '2': self.option_search_words,
-            '3': self.option_list_words,
-            '4': self.option_save_words,
-            '5': self.option_exit_program
+            '3': self.option_complete_words,
+            '4': self.option_search_text,
+            '5': self.option_list_words,
+            '6': self.option_save_words,
+            '7': self.option_exit_program,
+            self.PROFILING_MENU_KEY: self.option_profiling
         }
+        # 下一条命令是否在cProfile下执行
+        self._profile_next_command: bool = False
 
     def _get_enter(self) -> None:
         input("回车以继续...")
-        os.system('cls')
+        self._clear_screen()
+
+    def _clear_screen(self) -> None:
+        # Windows使用cls命令，其他系统直接输出ANSI清屏序列，无需启动子进程；输出不是终端时不清屏
+        if not sys.stdout.isatty():
+            return
+        if os.name == 'nt':
+            os.system('cls')
+        else:
+            print("\033[2J\033[H", end='', flush=True)
 
     def greet_user(self) -> None:
         print("===== 欢迎使用英语单词管理系统 =====")
+        if not self.word_manager.is_loaded():
+            print("词库正在后台加载，可以先浏览菜单")
+        elif self.word_manager.is_read_only():
+            print("词库以只读快照方式打开，只能查询，不能修改")
 
     def display_menu(self) -> str:
         self._get_enter()
@@ -55,10 +86,62 @@ class EnglishUI:
 
     def run_option(self, choice: str) -> None:
         command: Optional[Callable[[], None]] = self.commands.get(choice)
-        if command:
-            command()
-        else:
+        if command is None:
             print("无效的选择，请重试!")
+        elif self._profile_next_command and command != self.option_profiling:
+            self._profile_next_command = False
+            self._run_profiled(command)
+        else:
+            if not self.word_manager.is_loaded() and command not in (self.option_exit_program, self.option_profiling):
+                print("词库正在加载，请稍候...")
+            command()
+
+    def _run_profiled(self, command: Callable[[], None]) -> None:
+        path: str = input("剖析数据保存路径（留空不保存）: ").strip()
+        try:
+            _, report = profile_call(command, path or None)
+        except OSError as e:
+            print(f"保存剖析数据失败: {str(e)}", file=sys.stderr)
+            return
+        print(report)
+
+    def option_profiling(self) -> None:
+        while True:
+            print("===== 性能统计 ======")
+            print(f"统计状态: {'开启' if profiler.enabled else '关闭'}")
+            for i, option in enumerate(self.MENU_OPTIONS_PROFILING, 1):
+                print(f"{i}. {option}")
+            print("===========================")
+            choice: str = input(f"请选择操作 (1-{len(self.MENU_OPTIONS_PROFILING)}): ").strip()
+            if choice == '1':
+                print(profiler.format_table())
+                info: Dict[str, int] = self.word_manager.search_cache_info()
+                print(f"搜索缓存: 命中 {info['hits']} 次, 未命中 {info['misses']} 次, "
+                      f"条目 {info['size']}/{info['capacity']}")
+            elif choice == '2':
+                profiler.enabled = not profiler.enabled
+                print(f"统计已{'开启' if profiler.enabled else '关闭'}")
+            elif choice == '3':
+                profiler.reset()
+                print("统计已清空")
+            elif choice == '4':
+                path: str = input("请输入文件路径: ").strip()
+                if not path:
+                    print("路径不能为空!")
+                    continue
+                try:
+                    profiler.dump(path)
+                    print(f"统计已导出到 {path}")
+                except OSError as e:
+                    print(f"导出失败: {str(e)}", file=sys.stderr)
+            elif choice == '5':
+                self._profile_next_command = True
+                print("下一条主菜单命令将在cProfile下执行")
+                return
+            elif choice == '6':
+                return
+            else:
+                print("无效的选择!")
 
     def _show_word_details(self, word: Word) -> None:
         print(f"===== {word.spelling} 详情 =====")
@@ -89,15 +172,15 @@ class EnglishUI:
         print(f"单词 '{spelling}' 添加成功!")
 
     def option_list_words(self) -> None:
-        words: List[Word] = self.word_manager.get_all_words()
-        if not words:
+        total: int = self.word_manager.get_word_count()
+        if not total:
             print("没有单词记录!")
             return
 
-        print("\n===== 单词列表 ======")
-        for i, word in enumerate(words, 1):  # type: int, Word
-            print(f"{i}.", end='')
-            self._show_word_details(word)
+        chosen_word: Optional[Word] = self._select_word_from_pages(
+            "单词列表", f"共 {total} 个单词", total, self.word_manager.get_words_page)
+        if chosen_word is not None:
+            self._show_and_edit_word(chosen_word)
 
     def option_search_words(self) -> None:
         keyword: str = input("请输入查询关键词: ").strip()
@@ -105,26 +188,68 @@ class EnglishUI:
             print("关键词不能为空!")
             return
 
-        results: List[Word] = self.word_manager.search_words(keyword)
+        total: int = self.word_manager.count_search_results(keyword)
         
-        if not results:
+        if not total:
             print(f"未找到包含 '{keyword}' 的单词")
             return
 
+        # 每页只取到当前页为止的最佳结果，不对全部结果排序
+        chosen_word: Optional[Word] = self._select_word_from_pages(
+            "单词查询结果", f"关键词: '{keyword}' | 结果: {total} 个", total,
+            lambda start, size: self.word_manager.search_words(keyword, start + size)[start:])
+        if chosen_word is not None:
+            self._show_and_edit_word(chosen_word)
+
+    def option_complete_words(self) -> None:
+        prefix: str = input("请输入单词前缀: ").strip()
+        if not prefix:
+            print("前缀不能为空!")
+            return
+
+        total: int = self.word_manager.count_prefix(prefix)
+        if not total:
+            print(f"未找到以 '{prefix}' 开头的单词")
+            return
+
+        chosen_word: Optional[Word] = self._select_word_from_pages(
+            "前缀查询结果", f"前缀: '{prefix}' | 结果: {total} 个", total,
+            lambda start, size: self.word_manager.complete(prefix, size, start))
+        if chosen_word is not None:
+            self._show_and_edit_word(chosen_word)
+
+    def option_search_text(self) -> None:
+        query: str = input("请输入释义或例句中的词语（如 影响、take into account）: ").strip()
+        if not query:
+            print("查询内容不能为空!")
+            return
+
+        results: List[Word] = self.word_manager.search_text(query)
+        if not results:
+            print(f"未找到释义或例句中包含 '{query}' 的单词")
+            return
+
+        chosen_word: Optional[Word] = self._select_word_from_pages(
+            "全文查询结果", f"查询: '{query}' | 结果: {len(results)} 个", len(results),
+            lambda start, size: results[start:start + size])
+        if chosen_word is not None:
+            self._show_and_edit_word(chosen_word)
+
+    def _select_word_from_pages(self, title: str, summary: str, total: int,
+                                fetch_page: Callable[[int, int], List[Word]]) -> Optional[Word]:
+        # 分页显示单词拼写，只获取和渲染当前页；返回选中的单词，返回None表示退出
         page_size: int = PAGE_SIZE
         current_page: int = INITIAL_PAGE
-        total_pages: int = max(1, (len(results) + page_size - 1) // page_size)
+        total_pages: int = max(1, (total + page_size - 1) // page_size)
 
         while True:
             self._get_enter()
-            print(f"===== 单词查询结果 =====")
-            print(f"关键词: '{keyword}' | 结果: {len(results)} 个"
-                    + (" | 页码: {current_page}/{total_pages}" if total_pages > 1 else ""))
+            print(f"===== {title} =====")
+            print(summary + (f" | 页码: {current_page}/{total_pages}" if total_pages > 1 else ""))
             print("--------------------------")
 
             start: int = (current_page - 1) * page_size
-            end: int = start + page_size
-            page_results: List[Word] = results[start:end]
+            page_results: List[Word] = fetch_page(start, page_size)
             for i, word in enumerate(page_results, start=1):  # type: int, Word
                 print(f"{i}. {word.spelling}")
 
@@ -138,8 +263,7 @@ class EnglishUI:
             if choice.isdigit():
                 idx: int = int(choice) - 1
                 if 0 <= idx < len(page_results):
-                    chosen_word: Word = page_results[idx]
-                    break
+                    return page_results[idx]
                 else:
                     print("无效的数字选择!")
             elif choice == 'n' and current_page < total_pages:
@@ -147,10 +271,11 @@ class EnglishUI:
             elif choice == 'p' and current_page > 1:
                 current_page -= 1
             elif choice == 'q':
-                return
+                return None
             else:
                 print("无效操作!")
-        
+
+    def _show_and_edit_word(self, chosen_word: Word) -> None:
         self._show_word_details(chosen_word)
 
         edit: str = input("是否编辑单词? (Y/N): ").strip().lower()
@@ -300,7 +425,7 @@ class EnglishUI:
 
         if 0 <= idx < len(word.definitions):
             definition: Definition = word.definitions[idx]
-            word.del_definition(definition)
+            self.word_manager.del_definition_from_word(word, definition)
             print("删除成功!")
         else:
             print("无效的编号选择!")
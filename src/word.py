@@ -1,8 +1,29 @@
-from typing import List
+import sys
+import weakref
+from typing import Any, Dict, List, Optional
+
+
+def _make_parent_ref(word: Optional['Word']) -> Optional['weakref.ref']:
+    # 子对象对所属单词只持有弱引用，避免 单词 <-> 释义/例句 之间的引用环
+    return weakref.ref(word) if word is not None else None
+
+
+class _StrongParentRef:
+    # 与weakref.ref调用方式相同的强引用，见hold_parent
+    __slots__ = ('_word',)
+
+    def __init__(self, word: 'Word') -> None:
+        self._word = word
+
+    def __call__(self) -> 'Word':
+        return self._word
+
 
 class Example:
+    __slots__ = ('_parent_ref', 'original_sentence', 'translated_meaning')
+
     def __init__(self, parent_word: 'Word', original_sentence: str, translated_meaning: str) -> None:
-        # 所属单词（Word对象）
+        # 所属单词（Word对象，弱引用）
         self.parentWord = parent_word
         
         # 原句（字符串类型）
@@ -10,6 +31,15 @@ class Example:
         # 译句（字符串类型）
         self.translated_meaning = translated_meaning.strip() if isinstance(translated_meaning, str) else ""
     
+    @property
+    def parentWord(self) -> Optional['Word']:
+        """所属单词，单词已被回收时为None"""
+        return self._parent_ref() if self._parent_ref is not None else None
+
+    @parentWord.setter
+    def parentWord(self, word: Optional['Word']) -> None:
+        self._parent_ref = _make_parent_ref(word)
+
     def __str__(self):
         """字符串表示，便于打印和显示"""
         return f"{self.original_sentence} -> {self.translated_meaning}"
@@ -23,13 +53,18 @@ class Example:
             return self.original_sentence == value.original_sentence and self.translated_meaning == value.translated_meaning
         return False
 
+    def __hash__(self) -> int:
+        return hash((self.original_sentence, self.translated_meaning))
+
 
 class Definition:
+    __slots__ = ('_parent_ref', '_pos', 'meaning', 'examples')
+
     def __init__(self, parent_word: 'Word', pos: str = "", meaning: str = "") -> None:
-        # 所属单词（Word对象）
+        # 所属单词（Word对象，弱引用）
         self.parentWord = parent_word
         
-        # 词性（字符串类型）
+        # 词性（字符串类型，驻留以便所有释义共享同一个字符串对象）
         self.pos = pos.strip() if isinstance(pos, str) else ""
         
         # 释义内容
@@ -37,6 +72,23 @@ class Definition:
         
         # 例句列表
         self.examples: List[Example] = []
+
+    @property
+    def parentWord(self) -> Optional['Word']:
+        """所属单词，单词已被回收或释义已被删除时为None"""
+        return self._parent_ref() if self._parent_ref is not None else None
+
+    @parentWord.setter
+    def parentWord(self, word: Optional['Word']) -> None:
+        self._parent_ref = _make_parent_ref(word)
+
+    @property
+    def pos(self) -> str:
+        return self._pos
+
+    @pos.setter
+    def pos(self, pos: str) -> None:
+        self._pos = sys.intern(pos)
         
     def add_example(self, example: Example) -> None:
         """添加例句到列表"""
@@ -64,8 +116,13 @@ class Definition:
             return self.pos == value.pos and self.meaning == value.meaning
         return False
 
+    # 词性和释义会被就地修改（modify_definition），不能作为哈希依据，释义对象不可哈希
+    __hash__ = None
+
 
 class Word:
+    __slots__ = ('spelling', 'definitions', '__weakref__')
+
     def __init__(self, spelling: str):
         # 单词拼写（字符串类型）
         self.spelling = spelling.strip()
@@ -95,4 +152,49 @@ class Word:
     def __eq__(self, value: object, /) -> bool:
         if isinstance(value, Word):
             return self.spelling == value.spelling
-        return False
\ No newline at end of file
+        return False
+
+    def __hash__(self) -> int:
+        return hash(self.spelling)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为JSON可序列化的字典"""
+        return {
+            'spelling': self.spelling,
+            'definitions': [{
+                'pos': definition.pos,
+                'meaning': definition.meaning,
+                'examples': [{
+                    'original_sentence': example.original_sentence,
+                    'translated_meaning': example.translated_meaning
+                } for example in definition.examples]
+            } for definition in self.definitions]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Word':
+        """从字典（to_dict的格式）构建单词及其释义、例句"""
+        word = cls(data['spelling'])
+        for def_data in data.get('definitions', []):
+            definition = Definition(parent_word=word, pos=def_data['pos'], meaning=def_data['meaning'])
+            for example_data in def_data.get('examples', []):
+                definition.add_example(Example(word, example_data['original_sentence'],
+                                               example_data['translated_meaning']))
+            word.add_definition(definition)
+        return word
+
+
+def hold_parent(word: Word) -> Word:
+    """
+    让单词的释义、例句对单词持有强引用并返回该单词
+    用于按需临时构建、词库中并不保存的单词（如只读快照中的单词）：调用方只持有释义或例句时，
+    parentWord仍指向所属单词，而不会随临时单词被回收变为None。由此形成的引用环由循环垃圾回收释放
+    """
+    ref = _StrongParentRef(word)
+    for definition in word.definitions:
+        if definition._parent_ref is not None:
+            definition._parent_ref = ref
+        for example in definition.examples:
+            if example._parent_ref is not None:
+                example._parent_ref = ref
+    return word